@@ -1,13 +1,22 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from .config import PACKAGE_DIR
+from .jsonlib import dumps
 from .routes import router
 
-app = FastAPI(title="CLI Code Log", version="0.2.2")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson / msgspec when installed (jsonlib)."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+app = FastAPI(title="CLI Code Log", version="0.2.2", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,713 @@
+"""Persistent session catalog backing the projects and sessions lists.
+
+Stores one row per session file under DATA_DIR (project id, cwd, summary,
+timestamps, message count, sub-agent count) in ~/.clicodelog/catalog.db, so
+`get_projects` / `get_sessions` are indexed SQLite queries instead of a tree
+walk plus a full parse of every session file.
+
+Rows are validated by (size, mtime, inode): a refresh walks the backup dir
+with os.scandir, re-parses only files whose triple changed and drops rows for
+files that vanished. The backup dir only changes when we sync, so a full refresh
+runs once per source per process (lazily, on first use); after that a sync
+hands over the files it copied (`update_paths`) and nothing is re-walked.
+"""
+
+import os
+import posixpath
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .config import APP_DATA_DIR, DATA_DIR, SOURCES
+from .jsonlib import dumps, loads
+from .parallel import iter_batches
+from .utils import encode_path_id, get_codex_cwd, get_gemini_project_hash
+
+CATALOG_FILE = APP_DATA_DIR / "catalog.db"
+
+# Bump when the schema changes; an older catalog is dropped and rebuilt.
+_SCHEMA_VERSION = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path           TEXT PRIMARY KEY,
+    source         TEXT NOT NULL,
+    project_id     TEXT,
+    project_name   TEXT,
+    parent_id      TEXT,
+    session_id     TEXT NOT NULL,
+    cwd            TEXT,
+    summary        TEXT,
+    first_ts       TEXT,
+    last_ts        TEXT,
+    msg_count      INTEGER NOT NULL DEFAULT 0,
+    subagent_count INTEGER NOT NULL DEFAULT 0,
+    parsed         INTEGER NOT NULL DEFAULT 0,
+    size           INTEGER NOT NULL,
+    mtime          REAL NOT NULL,
+    inode          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_project
+    ON sessions (source, project_id, parent_id, mtime);
+CREATE INDEX IF NOT EXISTS sessions_by_id
+    ON sessions (source, project_id, session_id);
+CREATE TABLE IF NOT EXISTS usage (
+    path        TEXT NOT NULL,
+    day         TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    input       INTEGER NOT NULL,
+    output      INTEGER NOT NULL,
+    cache_read  INTEGER NOT NULL,
+    cache_write INTEGER NOT NULL,
+    requests    INTEGER NOT NULL,
+    PRIMARY KEY (path, day, model)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tool_calls (
+    path        TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    source      TEXT NOT NULL,
+    project_id  TEXT,
+    session_id  TEXT NOT NULL,
+    day         TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    ts          TEXT,
+    input_size  INTEGER NOT NULL,
+    output_size INTEGER,
+    duration_ms INTEGER,
+    file_path   TEXT,
+    error       INTEGER NOT NULL,
+    PRIMARY KEY (path, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tool_calls_by_duration ON tool_calls (source, duration_ms);
+CREATE INDEX IF NOT EXISTS tool_calls_by_size ON tool_calls (source, input_size + coalesce(output_size, 0));
+CREATE INDEX IF NOT EXISTS tool_calls_by_scope ON tool_calls (source, project_id, day);
+CREATE INDEX IF NOT EXISTS tool_calls_by_day ON tool_calls (source, day);
+CREATE TABLE IF NOT EXISTS tool_rollup (
+    path         TEXT NOT NULL,
+    day          TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    source       TEXT NOT NULL,
+    project_id   TEXT,
+    calls        INTEGER NOT NULL,
+    errors       INTEGER NOT NULL,
+    timed        INTEGER NOT NULL,
+    duration_sum INTEGER NOT NULL,
+    duration_max INTEGER,
+    input_bytes  INTEGER NOT NULL,
+    output_bytes INTEGER NOT NULL,
+    PRIMARY KEY (path, day, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tool_rollup_by_scope ON tool_rollup (source, project_id, day);
+CREATE TABLE IF NOT EXISTS file_index (
+    source      TEXT NOT NULL,
+    file_path   TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    project_id  TEXT,
+    mtime       REAL NOT NULL,
+    touches     TEXT NOT NULL,
+    PRIMARY KEY (source, file_path, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_index_by_session ON file_index (path);
+"""
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.RLock()
+_refresh_locks = {sid: threading.Lock() for sid in SOURCES}
+_refreshed: set = set()
+
+
+def _open() -> sqlite3.Connection:
+    APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(CATALOG_FILE), check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # str.lower, so case folding matches Python's beyond ASCII (SQLite's lower() does not).
+    conn.create_function("py_lower", 1, lambda s: s.lower() if s is not None else None, deterministic=True)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall():
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.commit()
+    return conn
+
+
+def _db() -> sqlite3.Connection:
+    """Shared connection; callers must hold `_lock` while using it."""
+    global _conn
+    if _conn is None:
+        try:
+            _conn = _open()
+        except sqlite3.DatabaseError:
+            # Corrupt or foreign file — the catalog is a pure cache, start over.
+            CATALOG_FILE.unlink(missing_ok=True)
+            _conn = _open()
+    return _conn
+
+
+def _scan(root: str):
+    """Yield (entry, depth, first_dir) for every file below root via os.scandir.
+    Symlinked directories are not followed (matches Path.rglob)."""
+    stack = [(root, 0, None)]
+    while stack:
+        d, level, first = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, level + 1, first or entry.name))
+                    else:
+                        yield entry, level, first
+                except OSError:
+                    continue
+
+
+def _iter_session_files(source_id: str, data_dir: Path):
+    """Yield (path, project_dir_name, parent_session_id) for a source's files."""
+    if source_id == "claude-code":
+        try:
+            project_dirs = [e for e in os.scandir(data_dir) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for pd in project_dirs:
+            for entry, _depth, first in _scan(pd.path):
+                if entry.name.endswith(".jsonl"):
+                    # Nested logs (<session>/subagents/*.jsonl) belong to the
+                    # session named by their top-level directory.
+                    yield entry.path, pd.name, first
+    elif source_id == "codex":
+        for entry, _depth, _first in _scan(str(data_dir)):
+            if entry.name.endswith(".jsonl"):
+                yield entry.path, None, None
+    else:  # gemini
+        for entry, _depth, _first in _scan(str(data_dir)):
+            name = entry.name
+            if (name.startswith("session-") and name.endswith(".json")
+                    and os.path.basename(os.path.dirname(entry.path)) == "chats"):
+                yield entry.path, None, None
+
+
+def _locate(source_id: str, data_dir: Path, path: str):
+    """(project_dir_name, parent_session_id) if path is one of the source's
+    session files (same rules as `_iter_session_files`), else None."""
+    try:
+        parts = Path(path).relative_to(data_dir).parts
+    except ValueError:
+        return None
+    name = parts[-1] if parts else ""
+    if source_id == "claude-code":
+        if len(parts) < 2 or not name.endswith(".jsonl"):
+            return None
+        return parts[0], (parts[1] if len(parts) > 2 else None)
+    if source_id == "codex":
+        return (None, None) if name.endswith(".jsonl") else None
+    if (name.startswith("session-") and name.endswith(".json")
+            and len(parts) >= 2 and parts[-2] == "chats"):
+        return None, None
+    return None
+
+
+def _build_row(source_id: str, path: str, project_dir: str | None, parent_id: str | None, st) -> dict:
+    # Lazy import: sessions imports this module for its queries.
+    from .sessions import _read_session_state
+
+    f = Path(path)
+    cwd = ""
+    if source_id == "claude-code":
+        project_id = project_dir
+        project_name = project_dir.replace("-", "/").lstrip("/")
+    elif source_id == "codex":
+        cwd = get_codex_cwd(f) or ""
+        project_id = encode_path_id(cwd) if cwd else None
+        project_name = cwd or None
+    else:  # gemini
+        ph = get_gemini_project_hash(f)
+        project_id = ph or None
+        project_name = f"Project {ph[:8]}..." if ph else None
+
+    state = _read_session_state(f, source_id)
+    if source_id == "claude-code" and state:
+        cwd = state.get("cwd") or ""
+    return {
+        "path": path,
+        "source": source_id,
+        "project_id": project_id,
+        "project_name": project_name,
+        "parent_id": parent_id,
+        "session_id": f.stem,
+        "cwd": cwd,
+        "summary": (state["first_summary"] or state["first_user_message"] or "No summary") if state else None,
+        "first_ts": state["first_timestamp"] if state else None,
+        "last_ts": state["last_timestamp"] if state else None,
+        "msg_count": state["message_count"] if state else 0,
+        "parsed": 1 if state else 0,
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "inode": st.st_ino,
+        "usage": [(path, day, model, *counters) for (day, model), counters in state["usage"].items()]
+        if state else [],
+        "tools": [(path, seq, source_id, project_id, f.stem, (call[1] or "")[:10], *call)
+                  for seq, call in enumerate(state["tools"])] if state else [],
+        "tool_rollup": _tool_rollup(path, source_id, project_id, state["tools"]) if state else [],
+        "files": _file_rows(path, source_id, project_id, st.st_mtime, state["touches"]) if state else [],
+    }
+
+
+def _tool_rollup(path: str, source_id: str, project_id, calls: list) -> list:
+    """Per (day, tool) totals of a session's tool calls, so the per-tool and
+    per-project stats sum a few rows per session instead of every call."""
+    acc: dict = {}
+    for name, ts, input_size, output_size, duration_ms, _, error in calls:
+        r = acc.get(((ts or "")[:10], name))
+        if r is None:
+            r = acc[((ts or "")[:10], name)] = [0, 0, 0, 0, None, 0, 0]
+        r[0] += 1
+        r[1] += error
+        if duration_ms is not None:
+            r[2] += 1
+            r[3] += duration_ms
+            r[4] = duration_ms if r[4] is None else max(r[4], duration_ms)
+        r[5] += input_size
+        r[6] += output_size or 0
+    return [(path, day, name, source_id, project_id, *r) for (day, name), r in acc.items()]
+
+
+def _file_rows(path: str, source_id: str, project_id, mtime: float, touches: list) -> list:
+    """file_index rows of a session: one per file it touched, holding the
+    [message index, tool, timestamp] of every touch as JSON."""
+    by_file: dict = {}
+    for file_path, msg_index, tool, ts in touches:
+        by_file.setdefault(file_path, []).append([msg_index, tool, ts])
+    return [(source_id, file_path, path, project_id, mtime, dumps(hits).decode())
+            for file_path, hits in by_file.items()]
+
+
+def _build_rows(source_id: str, batch: list) -> list:
+    """Rows for a batch of (path, project_dir, parent_id, stat); runs in a
+    worker process on large builds (parallel.iter_batches)."""
+    return [_build_row(source_id, *item) for item in batch]
+
+
+_UPSERT = """
+INSERT OR REPLACE INTO sessions
+    (path, source, project_id, project_name, parent_id, session_id, cwd, summary,
+     first_ts, last_ts, msg_count, parsed, size, mtime, inode)
+VALUES
+    (:path, :source, :project_id, :project_name, :parent_id, :session_id, :cwd, :summary,
+     :first_ts, :last_ts, :msg_count, :parsed, :size, :mtime, :inode)
+"""
+
+_USAGE_INSERT = "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_TOOLS_INSERT = "INSERT INTO tool_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_ROLLUP_INSERT = "INSERT INTO tool_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_FILES_INSERT = "INSERT INTO file_index VALUES (?, ?, ?, ?, ?, ?)"
+
+_SUBAGENT_COUNTS = """
+UPDATE sessions SET subagent_count = (
+    SELECT COUNT(*) FROM sessions AS c
+    WHERE c.source = sessions.source AND c.project_id = sessions.project_id
+      AND c.parent_id = sessions.session_id
+)
+WHERE source = ? AND parent_id IS NULL
+"""
+
+
+def _write_rows(conn, rows: list, gone=()) -> None:
+    """Upsert session rows and replace their usage counters, tool calls and
+    file index entries (caller holds `_lock` and the transaction)."""
+    conn.executemany(_UPSERT, rows)
+    stale = [(r["path"],) for r in rows] + list(gone)
+    conn.executemany("DELETE FROM usage WHERE path = ?", stale)
+    conn.executemany("DELETE FROM tool_calls WHERE path = ?", stale)
+    conn.executemany("DELETE FROM tool_rollup WHERE path = ?", stale)
+    conn.executemany(_USAGE_INSERT, [u for r in rows for u in r["usage"]])
+    conn.executemany(_TOOLS_INSERT, [t for r in rows for t in r["tools"]])
+    conn.executemany("DELETE FROM file_index WHERE path = ?", stale)
+    conn.executemany(_ROLLUP_INSERT, [t for r in rows for t in r["tool_rollup"]])
+    conn.executemany(_FILES_INSERT, [f for r in rows for f in r["files"]])
+
+
+def refresh_catalog(source_id: str | None = None) -> int:
+    """Bring the catalog in line with DATA_DIR for one source (or all). Only
+    files whose (size, mtime, inode) changed are re-parsed; returns how many."""
+    sources = [source_id] if source_id else list(SOURCES.keys())
+    reparsed = 0
+    for sid in sources:
+        if sid not in SOURCES:
+            continue
+        with _refresh_locks[sid]:
+            reparsed += _refresh_source(sid)
+            _refreshed.add(sid)
+    return reparsed
+
+
+def _refresh_source(source_id: str) -> int:
+    data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
+    with _lock:
+        known = {
+            r["path"]: (r["size"], r["mtime"], r["inode"])
+            for r in _db().execute(
+                "SELECT path, size, mtime, inode FROM sessions WHERE source = ?", (source_id,)
+            )
+        }
+
+    changed = []
+    seen = set()
+    if data_dir.exists():
+        for path, project_dir, parent_id in _iter_session_files(source_id, data_dir):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            if known.get(path) == (st.st_size, st.st_mtime, st.st_ino):
+                continue
+            changed.append((path, project_dir, parent_id, st))
+
+    if changed:
+        nbytes = sum(item[3].st_size for item in changed)
+        changed = [
+            row
+            for rows in iter_batches(_build_rows, source_id, changed, nbytes, f"catalog ({source_id})")
+            for row in rows
+        ]
+    gone = [(p,) for p in known.keys() - seen]
+    if not changed and not gone:
+        return 0
+    with _lock:
+        conn = _db()
+        with conn:
+            conn.executemany("DELETE FROM sessions WHERE path = ?", gone)
+            _write_rows(conn, changed, gone)
+            if source_id == "claude-code":
+                conn.execute(_SUBAGENT_COUNTS, (source_id,))
+    return len(changed)
+
+
+def update_paths(source_id: str, paths) -> int:
+    """Apply a change set (files added/updated under DATA_DIR, e.g. by a sync)
+    without walking the tree. Falls back to a full refresh if this process has
+    not reconciled the source yet. Returns how many files were re-parsed."""
+    if source_id not in SOURCES:
+        return 0
+    if source_id not in _refreshed:
+        return refresh_catalog(source_id)
+    data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
+    with _refresh_locks[source_id]:
+        rows = []
+        for path in paths:
+            located = _locate(source_id, data_dir, path)
+            if located is None:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            rows.append(_build_row(source_id, path, located[0], located[1], st))
+        if not rows:
+            return 0
+        with _lock:
+            conn = _db()
+            with conn:
+                _write_rows(conn, rows)
+                if source_id == "claude-code":
+                    conn.execute(_SUBAGENT_COUNTS, (source_id,))
+        return len(rows)
+
+
+def source_counts(source_id: str):
+    """(project_count, session_count) for a source; every session file counts,
+    including sub-agent logs and files that failed to parse."""
+    _ensure_fresh(source_id)
+    with _lock:
+        row = _db().execute(
+            "SELECT COUNT(DISTINCT project_id), COUNT(*) FROM sessions WHERE source = ?", (source_id,)
+        ).fetchone()
+    return row[0], row[1]
+
+
+def has_sessions(source_id: str) -> bool:
+    """Whether the catalog holds any row for a source, fresh or not."""
+    with _lock:
+        return _db().execute("SELECT 1 FROM sessions WHERE source = ? LIMIT 1", (source_id,)).fetchone() is not None
+
+
+def file_stats(source_id: str) -> dict:
+    """{path: (size, mtime)} of every session file of a source."""
+    _ensure_fresh(source_id)
+    with _lock:
+        return {
+            r["path"]: (r["size"], r["mtime"])
+            for r in _db().execute("SELECT path, size, mtime FROM sessions WHERE source = ?", (source_id,))
+        }
+
+
+def _ensure_fresh(source_id: str) -> None:
+    if source_id not in _refreshed:
+        refresh_catalog(source_id)
+
+
+def _session_info(row) -> dict:
+    return {
+        "id": row["session_id"],
+        "filename": os.path.basename(row["path"]),
+        "summary": row["summary"],
+        "message_count": row["msg_count"],
+        "first_timestamp": row["first_ts"],
+        "last_timestamp": row["last_ts"],
+        "size": row["size"],
+        "modified": datetime.fromtimestamp(row["mtime"]).isoformat(),
+        "full_path": row["path"],
+        "subagent_count": row["subagent_count"],
+    }
+
+
+def project_stats(source_id: str) -> list:
+    """[(project_id, project_name, session_count, latest_mtime)] ordered by the
+    project's display key (dir name / cwd / hash)."""
+    _ensure_fresh(source_id)
+    order = "project_name" if source_id == "codex" else "project_id"
+    with _lock:
+        return [
+            tuple(r) for r in _db().execute(
+                "SELECT project_id, project_name, COUNT(*), MAX(mtime) FROM sessions"
+                " WHERE source = ? AND project_id IS NOT NULL"
+                f" GROUP BY project_id ORDER BY {order}",
+                (source_id,),
+            )
+        ]
+
+
+def list_sessions(source_id: str, project_id: str, parent_id: str | None = None) -> list:
+    """Parsed sessions of a project, newest first. With parent_id, the
+    sub-agent logs of that session instead of the top-level sessions."""
+    _ensure_fresh(source_id)
+    parent_clause = "parent_id IS NULL" if parent_id is None else "parent_id = ?"
+    params = (source_id, project_id) + (() if parent_id is None else (parent_id,))
+    with _lock:
+        rows = _db().execute(
+            "SELECT * FROM sessions WHERE source = ? AND project_id = ? AND parsed = 1"
+            f" AND {parent_clause} ORDER BY mtime DESC",
+            params,
+        ).fetchall()
+    return [_session_info(r) for r in rows]
+
+
+def find_session(source_id: str, project_id: str, session_id: str) -> str | None:
+    """Path of a session file (top-level or sub-agent) in a project, or None."""
+    _ensure_fresh(source_id)
+    with _lock:
+        row = _db().execute(
+            "SELECT path FROM sessions WHERE source = ? AND project_id = ? AND session_id = ?"
+            " ORDER BY mtime DESC LIMIT 1",
+            (source_id, project_id, session_id),
+        ).fetchone()
+    return row["path"] if row else None
+
+
+def session_files(source_id: str, project_id: str | None = None) -> list:
+    """[(project_id, session_id, parent_id, path)] of the parsed sessions of a
+    source (or one project), grouped by project, sub-agent logs after their
+    parents, oldest first."""
+    _ensure_fresh(source_id)
+    project_clause = "" if project_id is None else " AND project_id = ?"
+    params = (source_id,) + (() if project_id is None else (project_id,))
+    with _lock:
+        return [
+            tuple(r) for r in _db().execute(
+                "SELECT project_id, session_id, parent_id, path FROM sessions"
+                f" WHERE source = ? AND parsed = 1 AND project_id IS NOT NULL{project_clause}"
+                " ORDER BY project_id, parent_id IS NOT NULL, mtime",
+                params,
+            )
+        ]
+
+
+_USAGE_GROUPS = {
+    "project": ("s.project_id", "MAX(s.project_name)"),
+    "session": ("s.session_id", "MAX(s.project_id)"),
+    "day": ("u.day", None),
+    "model": ("u.model", None),
+}
+
+
+def usage_rows(source_id: str, group_by, since: str | None = None, until: str | None = None,
+               project_id: str | None = None) -> list:
+    """Token counters summed per `group_by` key (project / session / day,
+    always split by model too, so cost can be priced per model) for days in
+    [since, until] (YYYY-MM-DD, inclusive). Dicts with the group keys, model,
+    the usage counters and, per project / session, its name / project."""
+    _ensure_fresh(source_id)
+    cols, extra = ["u.model AS model"], []
+    keys = ["u.model"]
+    for g in group_by:
+        if g == "model":
+            continue
+        key, label = _USAGE_GROUPS[g]
+        cols.append(f"{key} AS {g}")
+        keys.append(key)
+        if label:
+            extra.append(f"{label} AS {g}_label")
+    where, params = ["s.source = ?"], [source_id]
+    if since:
+        where.append("u.day >= ?")
+        params.append(since)
+    if until:
+        where.append("u.day <= ?")
+        params.append(until)
+    if project_id is not None:
+        where.append("s.project_id = ?")
+        params.append(project_id)
+    sql = (
+        f"SELECT {', '.join(cols + extra)}, SUM(u.input) AS input, SUM(u.output) AS output,"
+        " SUM(u.cache_read) AS cache_read, SUM(u.cache_write) AS cache_write, SUM(u.requests) AS requests"
+        " FROM usage AS u JOIN sessions AS s ON s.path = u.path"
+        f" WHERE {' AND '.join(where)} AND s.project_id IS NOT NULL"
+        f" GROUP BY {', '.join(keys)}"
+    )
+    with _lock:
+        return [dict(r) for r in _db().execute(sql, params)]
+
+
+def tool_stats(source_id: str, project_id: str | None = None, since: str | None = None,
+               until: str | None = None, limit: int = 20) -> dict:
+    """Tool-call analytics: per-tool counts and the tool mix of each project
+    (summed from tool_rollup), and the `limit` slowest / largest calls."""
+    _ensure_fresh(source_id)
+    filters = []  # (column, comparison, value) narrowing the scope
+    if since:
+        filters.append(("day", ">=", since))
+    if until:
+        filters.append(("day", "<=", until))
+    if project_id is not None:
+        filters.append(("project_id", "=", project_id))
+    params = [source_id] + [value for _, _, value in filters]
+
+    def scope(prefix: str = "") -> str:
+        # prefix "+" turns the filter columns into expressions SQLite will
+        # not pick an index for.
+        return " AND ".join(["source = ?", "project_id IS NOT NULL"]
+                            + [f"{prefix}{column} {op} ?" for column, op, _ in filters])
+
+    cond = scope()
+    call_cols = "name, project_id, session_id, ts, input_size, output_size, duration_ms, file_path, error"
+    with _lock:
+        conn = _db()
+        tools = [dict(r) for r in conn.execute(
+            "SELECT name, SUM(calls) AS calls, COUNT(DISTINCT path) AS sessions, SUM(errors) AS errors,"
+            " SUM(duration_sum) / NULLIF(SUM(timed), 0) AS avg_duration_ms, MAX(duration_max) AS max_duration_ms,"
+            " SUM(input_bytes) AS input_bytes, SUM(output_bytes) AS output_bytes"
+            f" FROM tool_rollup WHERE {cond} GROUP BY name ORDER BY calls DESC",
+            params,
+        )]
+        mix = conn.execute(
+            f"SELECT project_id, name, SUM(calls) FROM tool_rollup WHERE {cond} GROUP BY project_id, name",
+            params,
+        ).fetchall()
+        slowest, largest = [], []
+        if tools:
+            # Top-N plan: a project / date scope holding few of the source's
+            # calls is read through tool_calls_by_scope / _by_day and sorted;
+            # otherwise walk the duration / size index and stop after `limit`
+            # matches. The unary + keeps SQLite off the index not wanted.
+            matched = sum(t["calls"] for t in tools)
+            total = conn.execute("SELECT SUM(calls) FROM tool_rollup WHERE source = ?", (source_id,)).fetchone()[0]
+            narrow = matched * 8 < total
+            rank, cond = ("+", scope()) if narrow else ("", scope("+"))
+            slowest = [dict(r) for r in conn.execute(
+                f"SELECT {call_cols} FROM tool_calls WHERE {cond} AND duration_ms IS NOT NULL"
+                f" ORDER BY {rank}duration_ms DESC LIMIT ?",
+                params + [limit],
+            )]
+            largest = [dict(r) for r in conn.execute(
+                f"SELECT {call_cols} FROM tool_calls WHERE {cond}"
+                f" ORDER BY {rank}(input_size + coalesce(output_size, 0)) DESC LIMIT ?",
+                params + [limit],
+            )]
+        names = dict(conn.execute(
+            "SELECT project_id, MAX(project_name) FROM sessions WHERE source = ? AND parent_id IS NULL"
+            " GROUP BY project_id",
+            (source_id,),
+        ).fetchall()) if mix else {}
+
+    projects: dict = {}
+    for pid, tool, calls in mix:
+        proj = projects.setdefault(pid, {"project_id": pid, "project_name": names.get(pid), "calls": 0, "tools": {}})
+        proj["calls"] += calls
+        proj["tools"][tool] = calls
+    return {
+        "tools": tools,
+        "projects": sorted(projects.values(), key=lambda p: -p["calls"]),
+        "slowest": slowest,
+        "largest": largest,
+    }
+
+
+def file_touches(source_id: str, file_path: str, limit: int = 50) -> dict:
+    """Sessions whose tool calls read, wrote or otherwise named `file_path`,
+    or any file under it when it is a directory, most recently modified
+    first; each with its touches (file, message index, tool, timestamp).
+
+    An absolute path is a range scan of the file_index key; a relative one
+    matches recorded paths containing it as whole segments (they are
+    absolute whenever the session's cwd was known), a scan of the source."""
+    _ensure_fresh(source_id)
+    # Normalised like the recorded paths (sessions._resolve), so /a/./b,
+    # /a//b and /a/x/../b all mean /a/b and a relative ./b means b.
+    target = posixpath.normpath(file_path)
+    if file_path.startswith("/"):
+        target = "/" + target.lstrip("/")  # normpath keeps a leading "//"
+    target = target.rstrip("/")
+    if file_path.startswith("/"):
+        # target and everything under target/ sort in [target, target + "0")
+        # ("0" follows "/"); the second test drops siblings like target.bak.
+        match = "file_path >= ? AND file_path < ? AND (file_path = ? OR substr(file_path, ?, 1) = '/')"
+        params = [target, target + "0", target, len(target) + 1]
+    else:
+        match = "instr('/' || file_path || '/', ?) > 0"
+        params = ["/" + target + "/"]
+    where = f"source = ? AND project_id IS NOT NULL AND {match}"
+    params = [source_id] + params
+    with _lock:
+        conn = _db()
+        total = conn.execute(f"SELECT COUNT(DISTINCT path) FROM file_index WHERE {where}", params).fetchone()[0]
+        top = [r[0] for r in conn.execute(
+            f"SELECT path, MAX(mtime) AS mtime FROM file_index WHERE {where}"
+            " GROUP BY path ORDER BY mtime DESC LIMIT ?",
+            params + [limit],
+        )]
+        marks = ", ".join("?" * len(top))
+        info = conn.execute(
+            "SELECT path, project_id, project_name, session_id, parent_id FROM sessions"
+            f" WHERE path IN ({marks})",
+            top,
+        ).fetchall() if top else []
+        hits = conn.execute(
+            f"SELECT path, file_path, touches FROM file_index WHERE path IN ({marks}) AND {where}",
+            top + params,
+        ).fetchall() if top else []
+
+    touches: dict = {}
+    for r in hits:
+        touches.setdefault(r["path"], []).extend(
+            {"file_path": r["file_path"], "msg_index": i, "tool": tool, "timestamp": ts}
+            for i, tool, ts in loads(r["touches"])
+        )
+    sessions = []
+    for r in sorted(info, key=lambda r: top.index(r["path"])):
+        sessions.append({
+            "project_id": r["project_id"],
+            "project_name": r["project_name"],
+            "session_id": r["session_id"],
+            "parent_id": r["parent_id"],
+            "touches": sorted(touches.get(r["path"], []), key=lambda t: t["msg_index"]),
+        })
+    return {"total_sessions": total, "sessions": sessions}
@@ -3,6 +3,7 @@
 import argparse
 
 from clicodelog import __version__
+from clicodelog.config import SOURCES
 
 
 def main():
@@ -39,14 +40,58 @@ def main():
         default=None,
         help="Only show projects whose name contains this text (e.g. --folder ceszero)",
     )
+    parser.add_argument(
+        "--watch", "-w",
+        action="store_true",
+        help="Copy changed logs as they are written (inotify/watchdog) instead of hourly polling",
+    )
+    parser.add_argument(
+        "--sync-workers",
+        type=int,
+        default=None,
+        help="Threads used to copy each source tree during sync (default: 2x CPUs, max 16)",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Run in debug mode",
     )
 
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    dataset = subparsers.add_parser(
+        "export-dataset",
+        help="Write one row per message as a Parquet dataset for offline analysis (needs pyarrow)",
+    )
+    dataset.add_argument(
+        "--out", "-o",
+        type=str,
+        default=None,
+        help="Dataset directory (default: ~/.clicodelog/dataset)",
+    )
+    dataset.add_argument(
+        "--source", "-s",
+        action="append",
+        choices=list(SOURCES),
+        default=None,
+        help="Only export this source (repeatable; default: all)",
+    )
+    dataset.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild the dataset instead of adding only new or changed sessions",
+    )
+    dataset.add_argument(
+        "--skip-sync",
+        action="store_true",
+        help="Export the existing backup without syncing the sources first",
+    )
+
     args = parser.parse_args()
 
+    if args.command == "export-dataset":
+        export_dataset_command(parser, args)
+        return
+
     # Import here to avoid slow startup for --help/--version
     from clicodelog.server import run_server
 
@@ -56,8 +101,29 @@ def main():
         skip_sync=args.no_sync,
         debug=args.debug,
         folder=args.folder,
+        watch=args.watch,
+        sync_workers=args.sync_workers,
     )
 
 
+def export_dataset_command(parser, args):
+    """Sync, then bring the Parquet dataset up to date."""
+    from clicodelog.dataset import available, export_dataset
+
+    if not available():
+        parser.exit(1, 'export-dataset needs pyarrow: pip install "clicodelog[dataset]"\n')
+    sources = args.source or list(SOURCES)
+    if not args.skip_sync:
+        from clicodelog.sync import sync_data
+
+        for source_id in sources:
+            sync_data(source_id=source_id, silent=True)
+    summary = export_dataset(out_dir=args.out, sources=sources, full=args.full)
+    print(f"Dataset: {summary['out']}")
+    print(f"  {summary['sessions']:,} sessions exported ({summary['rows']:,} rows, "
+          f"{summary['parts_written']} new part files, {summary['parts_rewritten']} rewritten), "
+          f"{summary['removed']:,} removed, in {summary['elapsed']}s")
+
+
 if __name__ == "__main__":
     main()
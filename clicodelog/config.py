@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 PACKAGE_DIR = Path(__file__).parent
@@ -5,8 +6,63 @@ PACKAGE_DIR = Path(__file__).parent
 APP_DATA_DIR = Path.home() / ".clicodelog"
 DATA_DIR = APP_DATA_DIR / "data"
 PROJECT_META_FILE = APP_DATA_DIR / "project_meta.json"
+DATASET_DIR = APP_DATA_DIR / "dataset"  # default target of `clicodelog export-dataset`
 
 SYNC_INTERVAL = 3600  # seconds
+SYNC_WORKERS = min(16, (os.cpu_count() or 2) * 2)  # threads per source tree copy
+
+# Watcher mode (--watch): changed files are copied once writes have been quiet
+# for WATCH_DEBOUNCE seconds (at most WATCH_MAX_DELAY after the first event),
+# and a full re-walk only runs every RECONCILE_INTERVAL to catch missed events.
+WATCH_DEBOUNCE = 0.3  # seconds
+WATCH_MAX_DELAY = 1.0  # seconds
+RECONCILE_INTERVAL = 6 * 3600  # seconds
+
+# Parsed-conversation cache (conv_cache): in-memory budget, charged by
+# session file size, plus an optional compressed copy on disk for restarts.
+CONV_CACHE_BYTES = 256 * 1024 * 1024
+CONV_CACHE_SPILL = True
+CONV_CACHE_DISK_BYTES = 1024 * 1024 * 1024
+
+# Large index builds (cold start) parse files in INDEX_WORKERS processes
+# once at least PARALLEL_MIN_FILES files need parsing (parallel.py).
+INDEX_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_FILES = 200
+
+# Route handlers run blocking work on worker threads (offload.py): at most
+# this many calls per lane at once, each allowed REQUEST_TIMEOUT seconds.
+ROUTE_LANES = {
+    "read": 16,    # project / session lists, metadata, bookmarks
+    "parse": 8,    # conversation parsing and live tails
+    "search": 4,   # search (may scan files on a cold index)
+    "export": 4,   # exports
+    "write": 1,    # read-modify-write of the JSON stores
+}
+REQUEST_TIMEOUT = 120  # seconds
+
+# Estimated list prices in USD per million tokens: (input, output, cache read,
+# cache write). A model is priced by the longest key its name starts with;
+# models with no match are reported as unpriced. Edit to match your plan —
+# prices are applied when /api/stats/usage is queried, no re-index needed.
+MODEL_PRICES = {
+    "claude-opus-4-5": (5.0, 25.0, 0.50, 6.25),
+    "claude-opus-4": (15.0, 75.0, 1.50, 18.75),
+    "claude-sonnet-4": (3.0, 15.0, 0.30, 3.75),
+    "claude-3-7-sonnet": (3.0, 15.0, 0.30, 3.75),
+    "claude-3-5-sonnet": (3.0, 15.0, 0.30, 3.75),
+    "claude-haiku-4-5": (1.0, 5.0, 0.10, 1.25),
+    "claude-3-5-haiku": (0.80, 4.0, 0.08, 1.0),
+    "gpt-5-nano": (0.05, 0.40, 0.005, 0.0),
+    "gpt-5-mini": (0.25, 2.0, 0.025, 0.0),
+    "gpt-5": (1.25, 10.0, 0.125, 0.0),
+    "gpt-4.1": (2.0, 8.0, 0.50, 0.0),
+    "o4-mini": (1.10, 4.40, 0.275, 0.0),
+    "o3-mini": (1.10, 4.40, 0.55, 0.0),
+    "o3": (2.0, 8.0, 0.50, 0.0),
+    "gemini-2.5-flash-lite": (0.10, 0.40, 0.01, 0.0),
+    "gemini-2.5-flash": (0.30, 2.50, 0.03, 0.0),
+    "gemini-2.5-pro": (1.25, 10.0, 0.125, 0.0),
+}
 
 SOURCES = {
     "claude-code": {
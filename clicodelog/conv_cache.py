@@ -0,0 +1,160 @@
+"""Cache of parsed conversations, so re-opening a session skips the parser.
+
+Entries are keyed by backup file path and valid while its (size, mtime_ns)
+is unchanged; when a JSONL session has grown, the cached parse is resumed
+from its checkpoint instead of starting over (incremental.py). The
+in-memory LRU is bounded by CONV_CACHE_BYTES, charging each entry its file
+size — a rough but monotone proxy for the parsed size.
+With CONV_CACHE_SPILL every parse is also written, zlib-compressed, to
+~/.clicodelog/conv_cache/, so a restarted server reads the parsed form
+instead of re-parsing; that directory is trimmed to CONV_CACHE_DISK_BYTES,
+least recently used first.
+
+Cached conversations are shared between requests: treat them as read-only.
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from .config import APP_DATA_DIR, CONV_CACHE_BYTES, CONV_CACHE_DISK_BYTES, CONV_CACHE_SPILL
+from .jsonlib import dumps, loads
+
+SPILL_DIR = APP_DATA_DIR / "conv_cache"
+
+# Bump when the parsed conversation format changes; older spill files are ignored.
+_SPILL_VERSION = 2
+_PRUNE_EVERY = 32  # spill writes between disk budget checks
+
+_entries: OrderedDict = OrderedDict()  # path -> (size, mtime_ns, conv, checkpoint, cost)
+_bytes = 0
+_writes = 0
+_lock = threading.Lock()
+_stats = {"hits": 0, "disk_hits": 0, "resumes": 0, "misses": 0, "evictions": 0}
+
+
+def get_or_parse(path, parse, resume=None) -> dict:
+    """The parsed conversation for `path`. `parse()` returns (conv,
+    checkpoint); on a miss for a file that was cached at a smaller size,
+    `resume(conv, checkpoint)` is tried first and may return the same shape,
+    or None to fall back to a full parse (see incremental.py)."""
+    key = str(path)
+    st = os.stat(key)
+    with _lock:
+        cached = _entries.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return cached[2]
+
+    if cached is None and CONV_CACHE_SPILL:
+        cached = _read_spill(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            with _lock:
+                _stats["disk_hits"] += 1
+            _put(key, st, cached[2], cached[3])
+            return cached[2]
+
+    result = None
+    if cached and resume and cached[3]:
+        result = resume(cached[2], cached[3])
+    with _lock:
+        _stats["resumes" if result else "misses"] += 1
+    if result is not None:
+        # Not re-spilled: rewriting the whole conversation would cost as much
+        # as the parse we just avoided. The older spill stays a valid base.
+        conv, checkpoint = result
+    else:
+        conv, checkpoint = parse()
+        if "error" in conv:
+            return conv
+        if CONV_CACHE_SPILL:
+            _write_spill(key, st, conv, checkpoint)
+    _put(key, st, conv, checkpoint)
+    return conv
+
+
+def _put(key: str, st, conv: dict, checkpoint) -> None:
+    global _bytes
+    cost = st.st_size
+    if cost > CONV_CACHE_BYTES:
+        return
+    with _lock:
+        old = _entries.pop(key, None)
+        if old:
+            _bytes -= old[4]
+        _entries[key] = (st.st_size, st.st_mtime_ns, conv, checkpoint, cost)
+        _bytes += cost
+        while _bytes > CONV_CACHE_BYTES:
+            _, evicted = _entries.popitem(last=False)
+            _bytes -= evicted[4]
+            _stats["evictions"] += 1
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {**_stats, "entries": len(_entries), "bytes": _bytes, "budget_bytes": CONV_CACHE_BYTES}
+
+
+# --- Disk spill ----------------------------------------------------------------
+# One file per session: a JSON header line with the format version, the
+# source file's (size, mtime_ns) and the resume checkpoint, then the
+# zlib-compressed JSON conversation.
+def _spill_file(key: str):
+    return SPILL_DIR / (hashlib.sha1(key.encode()).hexdigest() + ".z")
+
+
+def _read_spill(key: str):
+    """(size, mtime_ns, conv, checkpoint) from the spill file, or None. The
+    caller decides whether it is current or only a base to resume from."""
+    spill = _spill_file(key)
+    try:
+        with open(spill, "rb") as fh:
+            header = loads(fh.readline())
+            if header.get("version") != _SPILL_VERSION:
+                return None
+            conv = loads(zlib.decompress(fh.read()))
+        os.utime(spill)  # recency for disk trimming
+        return header["size"], header["mtime_ns"], conv, header.get("checkpoint")
+    except (OSError, ValueError, KeyError, zlib.error):
+        return None
+
+
+def _write_spill(key: str, st, conv: dict, checkpoint) -> None:
+    global _writes
+    spill = _spill_file(key)
+    tmp = spill.with_suffix(f".{threading.get_ident()}.tmp")
+    try:
+        SPILL_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as fh:
+            fh.write(dumps({"version": _SPILL_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                            "checkpoint": checkpoint}) + b"\n")
+            fh.write(zlib.compress(dumps(conv), 1))
+        os.replace(tmp, spill)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return
+    with _lock:
+        _writes += 1
+        prune = _writes % _PRUNE_EVERY == 0
+    if prune:
+        _prune_spill()
+
+
+def _prune_spill() -> None:
+    try:
+        files = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(SPILL_DIR)
+                 if e.name.endswith(".z")]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= CONV_CACHE_DISK_BYTES:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
@@ -1,46 +1,162 @@
+from collections import deque
 from pathlib import Path
 
+from . import incremental
+from .catalog import find_session
 from .config import DATA_DIR, SOURCES
-from .parsers import parse_claude_conversation, parse_codex_conversation, parse_gemini_conversation
-from .utils import decode_path_id, get_codex_cwd, get_gemini_project_hash
+from .conv_cache import get_or_parse
+from .line_index import get_index, read_window
+from .parsers import gemini, parse_gemini_conversation
+from .parsers.codex import session_meta_summary
+from .utils import decode_path_id, encode_path_id
 
 
-def get_conversation(project_id: str, session_id: str, source_id: str) -> dict:
+def get_conversation(
+    project_id: str,
+    session_id: str,
+    source_id: str,
+    offset: int | None = None,
+    limit: int | None = None,
+    order: str = "oldest",
+) -> dict:
+    """Parsed conversation. With `offset` and/or `limit`, only that window of
+    messages is parsed and returned (see `_conversation_window`)."""
     if source_id not in SOURCES:
         return {"error": "Unknown source"}
 
-    data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
-    session_file = _find_session_file(data_dir, project_id, session_id, source_id)
+    session_file = _find_session_file(project_id, session_id, source_id)
 
     if not session_file or not session_file.exists():
         return {"error": "Session not found"}
 
-    if source_id == "claude-code":
-        return parse_claude_conversation(session_file, session_id)
-    elif source_id == "codex":
-        return parse_codex_conversation(session_file, session_id)
+    if offset is not None or limit is not None:
+        if order not in ("oldest", "newest"):
+            return {"error": "order must be 'oldest' or 'newest'"}
+        return _conversation_window(session_file, session_id, source_id, max(offset or 0, 0), limit, order)
+
+    return read_session_file(session_file, session_id, source_id)
+
+
+def read_session_file(session_file: Path, session_id: str, source_id: str) -> dict:
+    """Full parse of one session file through the conversation cache; a grown
+    JSONL file only has its new bytes parsed."""
+    if source_id == "gemini":
+        return get_or_parse(session_file, lambda: (parse_gemini_conversation(session_file, session_id), None))
+    return get_or_parse(
+        session_file,
+        lambda: incremental.parse(session_file, session_id, source_id),
+        lambda conv, checkpoint: incremental.resume(session_file, source_id, conv, checkpoint),
+    )
+
+
+def live_session_file(project_id: str, session_id: str, source_id: str):
+    """The file to follow for a live session: the original in the source dir
+    while it exists (it runs ahead of the backup between syncs), else the
+    backup. None if the session is unknown."""
+    if source_id not in SOURCES:
+        return None
+    backup = _find_session_file(project_id, session_id, source_id)
+    if backup is None:
+        return None
+    cfg = SOURCES[source_id]
+    try:
+        original = cfg["source_dir"] / backup.relative_to(DATA_DIR / cfg["data_subdir"])
+    except ValueError:
+        return backup
+    return original if original.is_file() else backup
+
+
+def _conversation_window(session_file: Path, session_id: str, source_id: str,
+                         offset: int, limit: int | None, order: str) -> dict:
+    """One page of messages. `offset` counts from the oldest message, or from
+    the newest with order="newest" (and the page is then newest-first).
+    JSONL sessions are read through the byte-offset sidecar, so only the
+    page's lines are parsed; `total` is the session's message count."""
+    if source_id == "gemini":
+        return _gemini_window(session_file, session_id, offset, limit, order)
+
+    index = get_index(session_file, source_id)
+    header = index[0]
+    total = len(index[1])
+
+    if limit is None or limit < 0:
+        limit = total
+    if order == "newest":
+        stop = max(total - offset, 0)
+        start = max(stop - limit, 0)
+    else:
+        start = min(offset, total)
+        stop = min(start + limit, total)
+
+    messages = read_window(session_file, source_id, index, start, stop)
+    page = {"summaries": header.get("summaries", [])}
+    if source_id == "codex":
+        page["meta"] = session_meta_summary(header.get("session_meta") or {})
+
+    if order == "newest":
+        messages.reverse()
+    page.update({
+        "messages": messages,
+        "session_id": session_id,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "order": order,
+    })
+    return page
+
+
+def _gemini_window(session_file: Path, session_id: str,
+                   offset: int, limit: int | None, order: str) -> dict:
+    """`_conversation_window` for a Gemini session: one streaming pass that
+    keeps only the page (oldest-first) or the last offset+limit messages
+    (newest-first), so memory is bounded by the page, not the file."""
+    meta: dict = {}
+    total = 0
+    unlimited = limit is None or limit < 0
+    if order == "newest":
+        kept = deque(maxlen=None if unlimited else offset + limit)
     else:
-        return parse_gemini_conversation(session_file, session_id)
+        kept = []
+    for msg in gemini.iter_messages(session_file, meta):
+        if order == "newest" or (total >= offset and (unlimited or total < offset + limit)):
+            kept.append(msg)
+        total += 1
+    if unlimited:
+        limit = total
 
+    messages = list(kept)
+    if order == "newest":
+        messages = messages[:max(len(messages) - offset, 0)]
+        messages.reverse()
+    return {
+        "summaries": [],
+        "meta": gemini.session_meta_summary(meta),
+        "messages": messages,
+        "session_id": session_id,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "order": order,
+    }
 
-def _find_session_file(data_dir: Path, project_id: str, session_id: str, source_id: str):
-    if source_id == "claude-code":
-        for f in (data_dir / project_id).rglob("*.jsonl"):
-            if f.stem == session_id:
-                return f
 
-    elif source_id == "codex":
+def _catalog_project_id(project_id: str, source_id: str):
+    """The project id as the catalog keys it, or None if it cannot be one."""
+    if source_id == "codex":
+        # Same normalisation as get_sessions: the catalog keys codex projects
+        # by encode_path_id(cwd).
         try:
-            target_cwd = decode_path_id(project_id)
+            return encode_path_id(decode_path_id(project_id))
         except Exception:
             return None
-        for f in data_dir.rglob("*.jsonl"):
-            if f.stem == session_id and get_codex_cwd(f) == target_cwd:
-                return f
+    return project_id
 
-    else:  # gemini
-        for f in data_dir.rglob("chats/session-*.json"):
-            if f.stem == session_id and get_gemini_project_hash(f) == project_id:
-                return f
 
-    return None
+def _find_session_file(project_id: str, session_id: str, source_id: str):
+    """Catalog lookup: (source, project, session) -> backup file path."""
+    project_id = _catalog_project_id(project_id, source_id)
+    if project_id is None:
+        return None
+    path = find_session(source_id, project_id, session_id)
+    return Path(path) if path else None
@@ -0,0 +1,250 @@
+"""Columnar export of every message for offline analysis.
+
+`export_dataset` writes a Parquet dataset with one row per message under
+DATASET_DIR, hive-partitioned as `source=<id>/project=<id>/part-*.parquet`
+(read it with `pyarrow.dataset.dataset(path, partitioning="hive")`, DuckDB,
+Polars, ...). Rows hold metadata only: ids, role, timestamp, model, token
+counts, tool names and text lengths, never the text.
+
+Exports are incremental. `_manifest.json` records the (size, mtime) of every
+session file exported and the part file holding its rows; a later export
+re-parses only new or changed sessions (in worker processes on large runs,
+parallel.py, dataset_rows.py), writes them as one new part per project, and rewrites the older
+parts that held their previous rows. Part files the manifest does not know
+(left by an interrupted export) are removed first.
+
+Needs pyarrow (`pip install "clicodelog[dataset]"`).
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .catalog import session_files
+from .config import DATASET_DIR, SOURCES
+from .dataset_rows import COLUMNS, batch_columns
+from .jsonlib import dumps, loads
+from .parallel import iter_batches
+
+MANIFEST = "_manifest.json"
+# Bump when the row layout changes; an older dataset is rebuilt from scratch.
+_DATASET_VERSION = 3
+
+_run_lock = threading.Lock()  # one export at a time per process
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _schema():
+    return pa.schema([
+        ("session_id", pa.string()),
+        ("parent_session_id", pa.string()),
+        ("message_index", pa.int32()),
+        ("role", pa.string()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("model", pa.string()),
+        ("input_tokens", pa.int64()),
+        ("output_tokens", pa.int64()),
+        ("cache_read_tokens", pa.int64()),
+        ("cache_write_tokens", pa.int64()),
+        ("tool_names", pa.list_(pa.string())),
+        ("tool_count", pa.int32()),
+        ("text_length", pa.int64()),
+        ("thinking_length", pa.int64()),
+    ])
+
+
+# --- Manifest -------------------------------------------------------------------
+def _load_manifest(out_dir: Path) -> dict:
+    try:
+        manifest = loads((out_dir / MANIFEST).read_bytes())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != _DATASET_VERSION:
+        return {}
+    return manifest.get("sessions", {})
+
+
+def _save_manifest(out_dir: Path, sessions: dict) -> None:
+    tmp = out_dir / (MANIFEST + ".tmp")
+    tmp.write_bytes(dumps({"version": _DATASET_VERSION, "sessions": sessions}))
+    os.replace(tmp, out_dir / MANIFEST)
+
+
+def _clear(out_dir: Path) -> None:
+    for entry in out_dir.glob("source=*"):
+        shutil.rmtree(entry, ignore_errors=True)
+    (out_dir / MANIFEST).unlink(missing_ok=True)
+
+
+def _remove_orphans(out_dir: Path, sessions: dict) -> None:
+    known = {e["part"] for e in sessions.values() if e.get("part")}
+    for part in out_dir.glob("source=*/project=*/*.parquet"):
+        if part.relative_to(out_dir).as_posix() not in known:
+            part.unlink(missing_ok=True)
+    for tmp in out_dir.glob("source=*/project=*/*.tmp"):
+        tmp.unlink(missing_ok=True)
+
+
+# --- Export -------------------------------------------------------------------
+def _drop_sessions(out_dir: Path, part: str, session_ids: set) -> bool:
+    """Rewrite a part without the rows of `session_ids`, deleting it if
+    nothing is left. False if the part was unreadable (and is now gone)."""
+    path = out_dir / part
+    try:
+        table = pq.read_table(path, schema=_schema())
+    except (OSError, pa.ArrowInvalid):
+        path.unlink(missing_ok=True)
+        return False
+    keep = table.filter(pc.invert(pc.is_in(table["session_id"], value_set=pa.array(sorted(session_ids)))))
+    if keep.num_rows == 0:
+        path.unlink(missing_ok=True)
+    elif keep.num_rows < table.num_rows:
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(keep, tmp, compression="zstd")
+        os.replace(tmp, path)
+    return True
+
+
+def _export_source(out_dir: Path, source_id: str, manifest: dict, summary: dict) -> None:
+    current = {}
+    for project_id, session_id, parent_id, path in session_files(source_id):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        current[path] = (project_id, session_id, parent_id, st.st_size, st.st_mtime)
+
+    todo = []
+    for path, (project_id, session_id, parent_id, size, mtime) in current.items():
+        entry = manifest.get(path)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            continue
+        todo.append((path, project_id, session_id, parent_id))
+    gone = [p for p, e in manifest.items() if e["source"] == source_id and p not in current]
+
+    # Older rows of changed / vanished sessions, grouped by the part holding them.
+    stale: dict = {}
+    for path in [item[0] for item in todo] + gone:
+        entry = manifest.get(path)
+        if entry and entry.get("part"):
+            stale.setdefault(entry["part"], set()).add(entry["session_id"])
+    queued = {item[0] for item in todo}
+    for part, session_ids in stale.items():
+        summary["parts_rewritten"] += 1
+        if _drop_sessions(out_dir, part, session_ids):
+            continue
+        # Unreadable part: every session it held is exported again.
+        for path in [p for p, e in manifest.items() if e.get("part") == part]:
+            manifest.pop(path)
+            if path in current and path not in queued:
+                project_id, session_id, parent_id = current[path][:3]
+                todo.append((path, project_id, session_id, parent_id))
+                queued.add(path)
+    for path in gone:
+        manifest.pop(path, None)
+    summary["removed"] += len(gone)
+
+    by_project: dict = {}
+    nbytes = sum(current[item[0]][3] for item in todo)
+    for results in iter_batches(batch_columns, source_id, todo, nbytes, f"dataset ({source_id})"):
+        for path, project_id, cols in results:
+            by_project.setdefault(project_id, []).append((path, cols))
+
+    for project_id, sessions in by_project.items():
+        merged = {name: [] for name in COLUMNS}
+        for _, cols in sessions:
+            for name in COLUMNS:
+                merged[name].extend(cols[name])
+        part = None
+        if merged["session_id"]:
+            part_dir = out_dir / f"source={source_id}" / f"project={project_id}"
+            part_dir.mkdir(parents=True, exist_ok=True)
+            name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+            pq.write_table(pa.Table.from_pydict(merged, schema=_schema()), part_dir / name,
+                           compression="zstd")
+            part = (part_dir / name).relative_to(out_dir).as_posix()
+            summary["parts_written"] += 1
+            summary["rows"] += len(merged["session_id"])
+        for path, cols in sessions:
+            _, session_id, _, size, mtime = current[path]
+            manifest[path] = {"source": source_id, "session_id": session_id, "size": size,
+                              "mtime": mtime, "part": part if cols["session_id"] else None,
+                              "rows": len(cols["session_id"])}
+    summary["sessions"] += len(todo)
+
+
+def export_dataset(out_dir: Path | None = None, sources=None, full: bool = False) -> dict:
+    """Bring the dataset under `out_dir` (default DATASET_DIR) up to date
+    with DATA_DIR for `sources` (default all). With `full`, start over.
+    Returns counts of what changed."""
+    if pa is None:
+        raise RuntimeError('Parquet export needs pyarrow: pip install "clicodelog[dataset]"')
+    out_dir = Path(out_dir or DATASET_DIR)
+    sources = [s for s in (sources or SOURCES) if s in SOURCES]
+    start = time.monotonic()
+    summary = {"out": str(out_dir), "sessions": 0, "rows": 0, "removed": 0,
+               "parts_written": 0, "parts_rewritten": 0}
+
+    with _run_lock:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = _load_manifest(out_dir)
+        if not manifest:
+            _clear(out_dir)  # nothing there can be trusted without a manifest
+        elif full:
+            for source_id in sources:
+                shutil.rmtree(out_dir / f"source={source_id}", ignore_errors=True)
+            manifest = {p: e for p, e in manifest.items() if e["source"] not in sources}
+        _remove_orphans(out_dir, manifest)
+
+        for source_id in sources:
+            _export_source(out_dir, source_id, manifest, summary)
+        _save_manifest(out_dir, manifest)
+    summary["elapsed"] = round(time.monotonic() - start, 2)
+    return summary
+
+
+# --- Background job (API) -----------------------------------------------------
+_job: dict | None = None
+_job_lock = threading.Lock()
+
+
+def _run_job(job: dict, sources) -> None:
+    try:
+        job["result"] = export_dataset(sources=sources)
+        job["status"] = "success"
+    except Exception as e:
+        job["status"] = "error"
+        job["message"] = str(e)
+    finally:
+        job["finished"] = time.time()
+
+
+def start_dataset_job(sources=None) -> dict:
+    """Start a dataset export on a worker thread, or return the one running."""
+    global _job
+    with _job_lock:
+        if _job is not None and _job["finished"] is None:
+            return dict(_job)
+        _job = {"status": "running", "sources": list(sources or SOURCES), "message": None,
+                "result": None, "started": time.time(), "finished": None}
+        threading.Thread(target=_run_job, args=(_job, sources), daemon=True).start()
+        return dict(_job)
+
+
+def dataset_job() -> dict | None:
+    """The current or last dataset export job, if any."""
+    with _job_lock:
+        return dict(_job) if _job is not None else None
@@ -0,0 +1,139 @@
+"""Per-message rows of the Parquet dataset (dataset.py), as plain column
+lists. Kept apart from dataset.py so the worker processes that build them on
+large exports (parallel.py) never import pyarrow.
+"""
+
+from datetime import datetime, timezone
+
+from .export import iter_session_messages
+from .jsonlib import loads
+from .parsers import codex
+from .sessions import _codex_tokens, _gemini_tokens
+
+COLUMNS = (
+    "session_id", "parent_session_id", "message_index", "role", "timestamp", "model",
+    "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens",
+    "tool_names", "tool_count", "text_length", "thinking_length",
+)
+_TOKEN_COLUMNS = ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")
+
+
+def _timestamp(value):
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _tokens(msg: dict):
+    """(input, output, cache_read, cache_write) as the usage rollup counts
+    them (sessions.py): Claude `usage` as reported, Gemini `tokens` split
+    the same way (input without the cached prompt, thoughts in output).
+    Codex messages carry none; see _codex_messages."""
+    usage = msg.get("usage")
+    if isinstance(usage, dict):
+        return (usage.get("input_tokens"), usage.get("output_tokens"),
+                usage.get("cache_read_input_tokens"), usage.get("cache_creation_input_tokens"))
+    tokens = msg.get("tokens")
+    if isinstance(tokens, dict):
+        return _gemini_tokens(tokens)
+    return None, None, None, None
+
+
+def _int(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _codex_messages(path: str, token_rows: dict):
+    """Yield a Codex session's messages as the viewer parses them, filling
+    `token_rows` {message index: token tuple}: each token_count entry counts
+    toward the assistant message before it (or the next one, if none yet)."""
+    parse = codex.new_state()
+    totals = {"token_total": None}
+    count = 0
+    target = None  # index of the last assistant message
+    carry = None  # counts seen before any assistant message
+    pending = None  # later tool_use / thinking entries merge into it
+    with open(path, "rb") as fh:
+        for line in fh:
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            msg = codex.feed_entry(entry, parse)
+            if msg is not None:
+                if msg["role"] == "assistant":
+                    target = count
+                    if carry is not None:
+                        token_rows[target], carry = carry, None
+                count += 1
+                if pending is not None:
+                    yield pending
+                pending = msg
+                continue
+            payload = entry.get("payload")
+            if entry.get("type") != "event_msg" or not isinstance(payload, dict):
+                continue
+            if payload.get("type") != "token_count":
+                continue
+            tokens = _codex_tokens(payload.get("info") or {}, totals)
+            if tokens is None:
+                continue
+            prev = carry if target is None else token_rows.get(target)
+            if prev is not None:
+                tokens = tuple(a + b for a, b in zip(prev, tokens))
+            if target is None:
+                carry = tokens
+            else:
+                token_rows[target] = tokens
+    if pending is not None:
+        yield pending
+
+
+def _session_columns(source_id: str, path: str, session_id: str, parent_id) -> dict:
+    cols = {name: [] for name in COLUMNS}
+    token_rows = {}
+    if source_id == "codex":
+        messages = _codex_messages(path, token_rows)
+    else:
+        _, messages = iter_session_messages(path, source_id)
+    for i, msg in enumerate(messages):
+        tokens = _tokens(msg)
+        tools = [str(t.get("name", "")) for t in msg.get("tool_uses") or [] if isinstance(t, dict)]
+        content = msg.get("content")
+        cols["session_id"].append(session_id)
+        cols["parent_session_id"].append(parent_id)
+        cols["message_index"].append(i)
+        cols["role"].append(msg.get("role"))
+        cols["timestamp"].append(_timestamp(msg.get("timestamp")))
+        cols["model"].append(msg.get("model"))
+        cols["input_tokens"].append(_int(tokens[0]))
+        cols["output_tokens"].append(_int(tokens[1]))
+        cols["cache_read_tokens"].append(_int(tokens[2]))
+        cols["cache_write_tokens"].append(_int(tokens[3]))
+        cols["tool_names"].append(tools)
+        cols["tool_count"].append(len(tools))
+        cols["text_length"].append(len(content) if isinstance(content, str) else 0)
+        cols["thinking_length"].append(len(msg.get("thinking") or ""))
+    for i, tokens in token_rows.items():
+        for name, value in zip(_TOKEN_COLUMNS, tokens):
+            cols[name][i] = value
+    return cols
+
+
+def batch_columns(source_id: str, batch: list) -> list:
+    """[(path, project_id, columns)] for a batch of (path, project_id,
+    session_id, parent_id); runs in a worker process on large exports."""
+    out = []
+    for path, project_id, session_id, parent_id in batch:
+        try:
+            cols = _session_columns(source_id, path, session_id, parent_id)
+        except (OSError, ValueError):
+            cols = {name: [] for name in COLUMNS}
+        out.append((path, project_id, cols))
+    return out
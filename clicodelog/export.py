@@ -0,0 +1,360 @@
+"""Session export as a stream of text chunks.
+
+Every format is a generator over a message iterator that reads the backup
+file as it goes (`iter_session_messages`), so memory stays flat however long
+the session is: neither the parsed conversation nor the rendered transcript
+is ever held whole. Bulk export (`iter_archive`) writes one session after
+another into a zip or tar.gz that is emitted as it is built, never staged
+on disk as a whole.
+"""
+
+import html
+import json
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+
+from .catalog import session_files
+from .conversation import _catalog_project_id, _find_session_file
+from .jsonlib import dumps, loads
+from .parsers import claude, codex, gemini
+
+_PARSERS = {"claude-code": claude, "codex": codex}
+
+_CHUNK = 64 * 1024  # bytes/characters collected before a chunk is emitted
+_SPOOL_BYTES = 8 * 1024 * 1024  # tar entries above this are spooled to a temp file
+
+SEP60 = "=" * 60
+SEP40 = "-" * 40
+
+
+# --- Reading ------------------------------------------------------------------
+def _claude_summaries(session_file) -> list:
+    # Summaries go at the top of an export but may be anywhere in the file;
+    # a quick pre-pass only decodes the lines that can hold one.
+    out = []
+    with open(session_file, "rb") as fh:
+        for line in fh:
+            if b'"summary"' not in line:
+                continue
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get("type") == "summary":
+                out.append(entry.get("summary", ""))
+    return out
+
+
+def _iter_jsonl_messages(session_file, source_id: str):
+    parser = _PARSERS[source_id]
+    state = parser.new_state()
+    pending = None  # codex merges later tool_use / thinking entries into it
+    with open(session_file, "rb") as fh:
+        for line in fh:
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            msg = parser.feed_entry(entry, state)
+            if msg is None:
+                continue
+            if pending is not None:
+                yield pending
+            pending = msg
+    if pending is not None:
+        yield pending
+
+
+def iter_session_messages(session_file, source_id: str):
+    """(summaries, message generator) for a backup file, same messages as a
+    full parse but read one at a time."""
+    if source_id == "gemini":
+        return [], gemini.iter_messages(session_file)
+    summaries = _claude_summaries(session_file) if source_id == "claude-code" else []
+    return summaries, _iter_jsonl_messages(session_file, source_id)
+
+
+def _session(project_id: str, session_id: str, source_id: str, summaries: list) -> dict:
+    return {
+        "session_id": session_id,
+        "project_id": project_id,
+        "project_name": project_id.replace("-", "/").lstrip("/"),
+        "source": source_id,
+        "summaries": summaries,
+    }
+
+
+# --- Formats --------------------------------------------------------------------
+# Each renderer takes the session header dict and a message iterator and
+# yields str pieces; `_coalesce` batches them into chunks.
+def _tokens(msg: dict):
+    usage = msg.get("usage")
+    if usage:
+        return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+    return None
+
+
+def _tool_input_lines(tool: dict) -> list:
+    if isinstance(tool.get("input"), dict):
+        out = []
+        for k, v in tool["input"].items():
+            val = str(v)
+            out.append(f"  {k}: {val[:200]}{'...' if len(val) > 200 else ''}")
+        return out
+    return [f"  {tool.get('input', '')}"]
+
+
+def render_txt(session: dict, messages):
+    lines = [SEP60, f"Session: {session['session_id']}", f"Project: {session['project_name']}", SEP60, ""]
+    if session["summaries"]:
+        lines.append("SUMMARIES:")
+        for s in session["summaries"]:
+            lines.append(f"  • {s}")
+        lines += ["", "-" * 60, ""]
+    yield "\n".join(lines)
+
+    for msg in messages:
+        lines = [f"[{msg['role'].upper()}] {msg.get('timestamp', '')}"]
+        if msg.get("model"):
+            lines.append(f"Model: {msg['model']}")
+        lines.append(SEP40)
+        if msg.get("content"):
+            lines.append(msg["content"])
+        if msg.get("thinking"):
+            lines += ["", "--- THINKING ---", msg["thinking"], "--- END THINKING ---"]
+        if msg.get("tool_uses"):
+            lines.append("")
+            for tool in msg["tool_uses"]:
+                lines.append(f"[TOOL: {tool['name']}]")
+                lines += _tool_input_lines(tool)
+        tokens = _tokens(msg)
+        if tokens is not None:
+            lines.append(f"\n[Tokens: {tokens}]")
+        lines += ["", SEP60, ""]
+        yield "\n" + "\n".join(lines)
+
+
+def _fence(text: str) -> str:
+    # A code fence longer than any backtick run inside the block.
+    run = longest = 0
+    for ch in text:
+        run = run + 1 if ch == "`" else 0
+        longest = max(longest, run)
+    return "`" * max(3, longest + 1)
+
+
+def _tool_json(value) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+
+
+def render_md(session: dict, messages):
+    out = [f"# Session `{session['session_id']}`", "",
+           f"- **Project:** {session['project_name']}", f"- **Source:** {session['source']}", ""]
+    if session["summaries"]:
+        out += ["## Summaries", ""] + [f"- {s}" for s in session["summaries"]] + [""]
+    yield "\n".join(out) + "\n"
+
+    for msg in messages:
+        title = msg["role"].capitalize()
+        if msg.get("timestamp"):
+            title += f" · {msg['timestamp']}"
+        out = ["---", "", f"## {title}", ""]
+        if msg.get("model"):
+            out += [f"*Model: {msg['model']}*", ""]
+        if msg.get("content"):
+            out += [str(msg["content"]), ""]
+        if msg.get("thinking"):
+            out += ["<details><summary>Thinking</summary>", "", msg["thinking"], "", "</details>", ""]
+        for tool in msg.get("tool_uses") or []:
+            body = _tool_json(tool.get("input", {}))
+            fence = _fence(body)
+            out += [f"**Tool: `{tool.get('name', '')}`**", "", fence + "json", body, fence, ""]
+        tokens = _tokens(msg)
+        if tokens is not None:
+            out += [f"*Tokens: {tokens}*", ""]
+        yield "\n".join(out) + "\n"
+
+
+def render_jsonl(session: dict, messages):
+    # One record per line: the session header, then the normalized messages.
+    yield dumps({"type": "session", **session}).decode() + "\n"
+    for msg in messages:
+        yield dumps({"type": "message", **msg}).decode() + "\n"
+
+
+_HTML_STYLE = """
+body{font:15px/1.5 -apple-system,BlinkMacSystemFont,"Segoe UI",sans-serif;max-width:960px;margin:2rem auto;padding:0 1rem;color:#1f2328;background:#fff}
+header{border-bottom:2px solid #d0d7de;margin-bottom:1.5rem}
+.msg{border:1px solid #d0d7de;border-radius:8px;margin:1rem 0;padding:.75rem 1rem}
+.msg.user{background:#f6f8fa}
+.meta{font-size:12px;color:#656d76;margin-bottom:.5rem}
+.content,pre{white-space:pre-wrap;word-wrap:break-word}
+pre{background:#f6f8fa;border-radius:6px;padding:.5rem;font-size:13px;overflow-x:auto}
+details{margin:.5rem 0}
+@media (prefers-color-scheme:dark){body{background:#0d1117;color:#e6edf3}.msg{border-color:#30363d}.msg.user,pre{background:#161b22}}
+"""
+
+
+def render_html(session: dict, messages):
+    esc = html.escape
+    out = ["<!DOCTYPE html>", '<html lang="en"><head><meta charset="utf-8">',
+           f"<title>Session {esc(session['session_id'])}</title>", f"<style>{_HTML_STYLE}</style>",
+           "</head><body>", "<header>", f"<h1>Session {esc(session['session_id'])}</h1>",
+           f"<p>Project: {esc(session['project_name'])} · Source: {esc(session['source'])}</p>"]
+    if session["summaries"]:
+        out.append("<ul>" + "".join(f"<li>{esc(s)}</li>" for s in session["summaries"]) + "</ul>")
+    out.append("</header>")
+    yield "\n".join(out) + "\n"
+
+    for msg in messages:
+        role = msg["role"]
+        meta = [role.capitalize()]
+        if msg.get("timestamp"):
+            meta.append(str(msg["timestamp"]))
+        if msg.get("model"):
+            meta.append(str(msg["model"]))
+        tokens = _tokens(msg)
+        if tokens is not None:
+            meta.append(f"{tokens} tokens")
+        out = [f'<section class="msg {esc(role)}">', f'<div class="meta">{esc(" · ".join(meta))}</div>']
+        if msg.get("content"):
+            out.append(f'<div class="content">{esc(str(msg["content"]))}</div>')
+        if msg.get("thinking"):
+            out.append(f"<details><summary>Thinking</summary><pre>{esc(msg['thinking'])}</pre></details>")
+        for tool in msg.get("tool_uses") or []:
+            out.append(f"<details><summary>Tool: {esc(tool.get('name', ''))}</summary>"
+                       f"<pre>{esc(_tool_json(tool.get('input', {})))}</pre></details>")
+        out.append("</section>")
+        yield "\n".join(out) + "\n"
+    yield "</body></html>\n"
+
+
+# format -> (media type, renderer); the format name is also the file extension.
+FORMATS = {
+    "txt": ("text/plain", render_txt),
+    "md": ("text/markdown", render_md),
+    "jsonl": ("application/x-ndjson", render_jsonl),
+    "html": ("text/html", render_html),
+}
+
+ARCHIVES = {
+    "zip": ("application/zip", "zip"),
+    "tar": ("application/gzip", "tar.gz"),
+}
+
+
+def _coalesce(pieces, size: int = _CHUNK):
+    buf, n = [], 0
+    for piece in pieces:
+        buf.append(piece)
+        n += len(piece)
+        if n >= size:
+            yield "".join(buf)
+            buf, n = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def _render(session_file, project_id: str, session_id: str, source_id: str, fmt: str):
+    summaries, messages = iter_session_messages(session_file, source_id)
+    return FORMATS[fmt][1](_session(project_id, session_id, source_id, summaries), messages)
+
+
+# --- Single session -------------------------------------------------------------
+def iter_export(project_id: str, session_id: str, source_id: str, fmt: str):
+    """Chunks of one session in `fmt`, or None if the session is unknown."""
+    session_file = _find_session_file(project_id, session_id, source_id)
+    if session_file is None or not session_file.exists():
+        return None
+    return _coalesce(_render(session_file, project_id, session_id, source_id, fmt))
+
+
+# --- Archives -----------------------------------------------------------------
+class _Sink:
+    """Write-only file object collecting archive bytes until drained."""
+
+    def __init__(self):
+        self._parts = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self.size = 0
+        return data
+
+
+def archive_members(source_id: str, project_id: str | None = None):
+    """[(arcname, project_id, session_id, path)] for a project or, with no
+    project_id, a whole source; None if the project id cannot be valid."""
+    prefix = ""
+    if project_id is not None:
+        project_id = _catalog_project_id(project_id, source_id)
+        if project_id is None:
+            return None
+    else:
+        prefix = f"{source_id}/"
+    out = []
+    for pid, sid, parent_id, path in session_files(source_id, project_id):
+        sub = f"{parent_id}/subagents/" if parent_id else ""
+        out.append((f"{prefix}{pid}/{sub}{sid}", pid, sid, path))
+    return out
+
+
+def iter_archive(members: list, source_id: str, fmt: str, archive: str):
+    """Bytes of a zip / tar.gz holding each member rendered in `fmt`, emitted
+    as it is built."""
+    sink = _Sink()
+    ext = fmt
+    if archive == "zip":
+        # An unseekable target makes zipfile write data descriptors, so each
+        # entry streams straight through without knowing its size up front.
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for arcname, pid, sid, path in members:
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                info = zipfile.ZipInfo(f"{arcname}.{ext}", time.localtime(mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with zf.open(info, "w", force_zip64=True) as entry:
+                    for chunk in _coalesce(_render(path, pid, sid, source_id, fmt)):
+                        entry.write(chunk.encode("utf-8"))
+                        if sink.size >= _CHUNK:
+                            yield sink.drain()
+                if sink.size >= _CHUNK:
+                    yield sink.drain()
+    else:
+        # Tar headers carry the entry size, so each entry is rendered into a
+        # spooled buffer first (in memory up to _SPOOL_BYTES).
+        with tarfile.open(fileobj=sink, mode="w|gz") as tf:
+            for arcname, pid, sid, path in members:
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                with tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES) as spool:
+                    for chunk in _coalesce(_render(path, pid, sid, source_id, fmt)):
+                        spool.write(chunk.encode("utf-8"))
+                    info = tarfile.TarInfo(f"{arcname}.{ext}")
+                    info.size = spool.tell()
+                    info.mtime = int(mtime)
+                    spool.seek(0)
+                    tf.addfile(info, spool)
+                if sink.size >= _CHUNK:
+                    yield sink.drain()
+    if sink.size:
+        yield sink.drain()
@@ -0,0 +1,268 @@
+"""SQLite FTS5 full-text index over message bodies.
+
+One FTS row per parsed message (user text, assistant text, thinking, tool
+inputs) plus one for a session's summaries, stored in the catalog database.
+Kept in step with DATA_DIR by `search_index.refresh_index`, which hands over
+the (size, mtime) of every session file in the catalog: only new or changed
+files are re-parsed, rows of vanished files are dropped. A Claude / Codex
+file that was only appended to resumes from the checkpoint stored with it
+(incremental.py) and indexes just the new messages.
+
+Uses the trigram tokenizer when SQLite has it, so a query matches any
+substring (like the old transcript scan did) with no cap on file size.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from . import incremental
+from .catalog import _db, _lock
+from .jsonlib import dumps, loads
+from .parallel import iter_batches
+from .parsers import parse_claude_conversation, parse_codex_conversation, parse_gemini_conversation
+
+_PARSERS = {
+    "claude-code": parse_claude_conversation,
+    "codex": parse_codex_conversation,
+    "gemini": parse_gemini_conversation,
+}
+
+_available: bool | None = None
+_trigram = False
+
+
+def _ensure_schema() -> bool:
+    """Create the FTS tables on first use. False if SQLite lacks FTS5."""
+    global _available, _trigram
+    if _available is not None:
+        return _available
+    with _lock:
+        conn = _db()
+        try:
+            try:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS fts_body USING fts5(body, tokenize='trigram')")
+            except Exception:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS fts_body USING fts5(body)")
+            _trigram = "trigram" in (conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'fts_body'"
+            ).fetchone()[0] or "")
+        except Exception:
+            _available = False
+            return False
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fts_messages (
+                id        INTEGER PRIMARY KEY,
+                path      TEXT NOT NULL,
+                msg_index INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS fts_messages_by_path ON fts_messages (path);
+            CREATE TABLE IF NOT EXISTS fts_files (
+                path   TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                size   INTEGER NOT NULL,
+                mtime  REAL NOT NULL,
+                resume BLOB
+            );
+        """)
+        conn.commit()
+    _available = True
+    return True
+
+
+def available() -> bool:
+    return _ensure_schema()
+
+
+def _tool_input_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    try:
+        return json.dumps(value, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _documents(conv: dict, start: int = 0, summaries: bool = True):
+    """Yield (msg_index, body) for every searchable piece of a conversation,
+    or only for its summaries (if `summaries`) and messages from `start` on."""
+    if summaries and conv.get("summaries"):
+        yield None, "\n".join(s for s in conv["summaries"] if s)
+    messages = conv.get("messages", [])
+    for i in range(start, len(messages)):
+        msg = messages[i]
+        parts = []
+        if msg.get("content"):
+            parts.append(msg["content"] if isinstance(msg["content"], str) else _tool_input_text(msg["content"]))
+        if msg.get("thinking"):
+            parts.append(msg["thinking"])
+        for tool in msg.get("tool_uses") or []:
+            parts.append(tool.get("name", ""))
+            parts.append(_tool_input_text(tool.get("input", "")))
+        body = "\n".join(p for p in parts if p)
+        if body:
+            yield i, body
+
+
+def _delete_path(conn, path: str) -> None:
+    conn.execute(
+        "DELETE FROM fts_body WHERE rowid IN (SELECT id FROM fts_messages WHERE path = ?)", (path,)
+    )
+    conn.execute("DELETE FROM fts_messages WHERE path = ?", (path,))
+    conn.execute("DELETE FROM fts_files WHERE path = ?", (path,))
+
+
+def _delete_from(conn, path: str, start: int, summaries: bool) -> None:
+    """Drop the rows of messages `start` on (and the summaries row, if
+    `summaries`), which an appended file re-indexes."""
+    where = "path = ? AND (msg_index >= ? OR (? AND msg_index IS NULL))"
+    args = (path, start, summaries)
+    conn.execute(f"DELETE FROM fts_body WHERE rowid IN (SELECT id FROM fts_messages WHERE {where})", args)
+    conn.execute(f"DELETE FROM fts_messages WHERE {where}", args)
+
+
+def _resume_point(conv: dict, checkpoint: dict) -> dict:
+    """What `_resume` needs to continue after this parse: the checkpoint, the
+    message count, the last message (Codex merges later entries into it)
+    and the summaries."""
+    messages = conv["messages"]
+    return {"checkpoint": checkpoint, "count": len(messages),
+            "last": messages[-1] if messages else None, "summaries": conv["summaries"]}
+
+
+def _resume(source_id: str, path: str, point: dict):
+    """(start, docs, resume point) for the messages appended since `point`,
+    or None if the file was rewritten."""
+    if os.path.getsize(path) <= point["checkpoint"]["end"]:
+        return None  # changed but not grown: rewritten in place
+    count = point["count"]
+    messages = [None] * (count - 1) + [point["last"]] if count else []
+    conv = {"summaries": point["summaries"], "messages": messages, "session_id": Path(path).stem}
+    result = incremental.resume(path, source_id, conv, point["checkpoint"])
+    if result is None:
+        return None
+    conv, checkpoint = result
+    # A Codex message can still grow after its own entry; re-index the last one.
+    start = max(count - 1, 0) if source_id == "codex" else count
+    docs = list(_documents(conv, start, summaries=conv["summaries"] != point["summaries"]))
+    return start, docs, _resume_point(conv, checkpoint)
+
+
+def _file_documents(source_id: str, path: str, point: dict | None):
+    """(start, docs, resume point) for one file. `start` is None when `docs`
+    cover the whole file, else the first message they replace."""
+    try:
+        if source_id not in incremental._PARSERS:
+            return None, list(_documents(_PARSERS[source_id](Path(path), Path(path).stem))), None
+        if point is not None:
+            result = _resume(source_id, path, point)
+            if result is not None:
+                return result
+        conv, checkpoint = incremental.parse(path, Path(path).stem, source_id)
+        return None, list(_documents(conv)), _resume_point(conv, checkpoint)
+    except Exception as e:
+        print(f"(full-text index skipped {path}: {e})")
+        return None, [], None
+
+
+def _batch_documents(source_id: str, batch: list) -> list:
+    """[(path, size, mtime, start, docs, resume point)] for a batch of
+    (path, size, mtime, resume point); runs in a worker process on large
+    builds (parallel.iter_batches)."""
+    return [(path, size, mtime, *_file_documents(source_id, path, point))
+            for path, size, mtime, point in batch]
+
+
+def _write_file(source_id: str, path: str, size: int, mtime: float, start, docs: list, point) -> None:
+    with _lock:
+        conn = _db()
+        with conn:
+            if start is None:
+                _delete_path(conn, path)
+            else:
+                _delete_from(conn, path, start, any(i is None for i, _ in docs))
+            for msg_index, body in docs:
+                rowid = conn.execute(
+                    "INSERT INTO fts_messages (path, msg_index) VALUES (?, ?)", (path, msg_index)
+                ).lastrowid
+                conn.execute("INSERT INTO fts_body (rowid, body) VALUES (?, ?)", (rowid, body))
+            conn.execute(
+                "INSERT OR REPLACE INTO fts_files (path, source, size, mtime, resume) VALUES (?, ?, ?, ?, ?)",
+                (path, source_id, size, mtime, dumps(point) if point is not None else None),
+            )
+
+
+def sync_files(source_id: str, files: dict) -> None:
+    """Reconcile the index for one source with `files` ({path: (size, mtime)},
+    the complete current set): index new/changed files, drop vanished ones."""
+    if not _ensure_schema():
+        return
+    with _lock:
+        known = {
+            r[0]: (r[1], r[2])
+            for r in _db().execute("SELECT path, size, mtime FROM fts_files WHERE source = ?", (source_id,))
+        }
+    gone = known.keys() - files.keys()
+    if gone:
+        with _lock:
+            conn = _db()
+            with conn:
+                for path in gone:
+                    _delete_path(conn, path)
+    update_files(source_id, {p: v for p, v in files.items() if known.get(p) != v})
+
+
+def _resume_points(paths) -> dict:
+    points = {}
+    with _lock:
+        conn = _db()
+        for path in paths:
+            row = conn.execute("SELECT resume FROM fts_files WHERE path = ?", (path,)).fetchone()
+            if row is not None and row[0] is not None:
+                points[path] = loads(row[0])
+    return points
+
+
+def update_files(source_id: str, files: dict) -> None:
+    """(Re-)index just these files ({path: (size, mtime)}); others untouched.
+    Files that only grew since they were indexed add just their new messages."""
+    if not _ensure_schema():
+        return
+    points = _resume_points(files) if source_id in incremental._PARSERS else {}
+    items = [(path, size, mtime, points.get(path)) for path, (size, mtime) in files.items()]
+    nbytes = sum(item[1] for item in items)
+    for results in iter_batches(_batch_documents, source_id, items, nbytes, f"full-text index ({source_id})"):
+        for path, size, mtime, start, docs, point in results:
+            _write_file(source_id, path, size, mtime, start, docs, point)
+
+
+def search(query: str, source_id: str, limit: int = 50) -> list:
+    """Sessions whose messages contain `query` (case-insensitive), most
+    recently modified first. Freshness is the caller's (search_index.revalidate)."""
+    q = (query or "").strip()
+    if not q or not _ensure_schema():
+        return []
+    if _trigram and len(q) >= 3:
+        match = "fts_body MATCH ?"
+        arg = '"' + q.replace('"', '""') + '"'
+    else:
+        # Trigrams need >= 3 chars, and without them we still want substring
+        # semantics: LIKE runs over the indexed text, not the raw files.
+        match = "fts_body.body LIKE ? ESCAPE '\\'"
+        arg = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    sql = f"""
+        SELECT s.project_id, s.session_id, s.project_name
+        FROM sessions AS s
+        WHERE s.source = ? AND s.project_id IS NOT NULL AND s.path IN (
+            SELECT m.path FROM fts_body JOIN fts_messages AS m ON m.id = fts_body.rowid
+            WHERE {match}
+        )
+        ORDER BY s.mtime DESC
+        LIMIT ?
+    """
+    with _lock:
+        rows = _db().execute(sql, (source_id, arg, limit)).fetchall()
+    return [
+        {"project_id": r[0], "session_id": r[1], "project_name": r[2]}
+        for r in rows
+    ]
@@ -0,0 +1,104 @@
+"""Resumable parsing of Claude / Codex JSONL sessions.
+
+`parse` returns the conversation plus a checkpoint: the byte offset parsed
+up to, the file's inode, a hash of the bytes just before that offset and the
+parser state that is not already in the conversation (the Codex raw
+session_meta). `resume` continues from a checkpoint when the file has only
+been appended to, so re-reading a live session costs only the new bytes.
+
+The result is the same as a full parse: a half-written last line is left
+for the next call, and the Codex consolidation buffer is the last message.
+"""
+
+import hashlib
+import os
+
+from .jsonlib import loads
+from .parsers import claude, codex
+
+_PARSERS = {"claude-code": claude, "codex": codex}
+
+_TAIL_BYTES = 64  # bytes before the checkpoint hashed to detect a rewrite
+
+
+def _tail_hash(fh, end: int) -> str:
+    start = max(0, end - _TAIL_BYTES)
+    fh.seek(start)
+    return hashlib.sha1(fh.read(end - start)).hexdigest()
+
+
+def parse(session_file, session_id: str, source_id: str):
+    """(conversation, checkpoint) from a full parse of the file."""
+    parser = _PARSERS[source_id]
+    state = parser.new_state()
+    conv = {"summaries": state["summaries"], "messages": [], "session_id": session_id}
+    return _continue(session_file, source_id, conv, state,
+                     {"end": 0, "inode": os.stat(session_file).st_ino, "open_line": False})
+
+
+def resume(session_file, source_id: str, conv: dict, checkpoint: dict):
+    """(conversation, checkpoint) extended with the bytes appended since
+    `checkpoint`, or None if the file was replaced or rewritten. `conv` is
+    left untouched (it may be shared); the result is a new dict."""
+    try:
+        st = os.stat(session_file)
+        if st.st_ino != checkpoint["inode"] or st.st_size < checkpoint["end"]:
+            return None
+        with open(session_file, "rb") as fh:
+            if _tail_hash(fh, checkpoint["end"]) != checkpoint["tail"]:
+                return None
+    except (OSError, KeyError):
+        return None
+
+    parser = _PARSERS[source_id]
+    messages = list(conv["messages"])
+    if source_id == "codex":
+        state = parser.new_state(checkpoint.get("session_meta"))
+        if messages:
+            # Later tool_use / thinking entries merge into the last message.
+            last = dict(messages[-1])
+            if last.get("tool_uses"):
+                last["tool_uses"] = list(last["tool_uses"])
+            messages[-1] = state["last"] = last
+    else:
+        state = parser.new_state()
+        state["summaries"].extend(conv.get("summaries", []))
+    new_conv = {**conv, "summaries": state["summaries"], "messages": messages}
+    return _continue(session_file, source_id, new_conv, state, checkpoint)
+
+
+def _continue(session_file, source_id: str, conv: dict, state: dict, checkpoint: dict):
+    parser = _PARSERS[source_id]
+    pos = checkpoint["end"]
+    open_line = checkpoint.get("open_line", False)
+    with open(session_file, "rb") as fh:
+        fh.seek(pos)
+        if open_line:
+            # The last parse consumed a complete entry that had no newline yet.
+            nl = fh.read(1)
+            if nl not in (b"\n", b""):
+                return None
+            pos = fh.tell()
+            open_line = not nl
+        for line_num, line in enumerate(fh):
+            try:
+                entry = loads(line)
+            except ValueError as e:
+                if not line.endswith(b"\n"):
+                    break  # half-written last line; picked up next time
+                print(f"Error parsing line {line_num}: {e}")
+                pos += len(line)
+                continue
+            open_line = not line.endswith(b"\n")
+            pos += len(line)
+            msg = parser.feed_entry(entry, state)
+            if msg is not None:
+                conv["messages"].append(msg)
+        tail = _tail_hash(fh, pos)
+
+    if source_id == "codex":
+        conv["meta"] = codex.session_meta_summary(state["session_meta"])
+    checkpoint = {"end": pos, "inode": checkpoint["inode"], "tail": tail, "open_line": open_line}
+    if source_id == "codex":
+        checkpoint["session_meta"] = state["session_meta"]
+    return conv, checkpoint
@@ -0,0 +1,55 @@
+"""JSON decode/encode through the fastest installed backend.
+
+orjson, then msgspec, then the standard library — neither is required.
+`loads` behaves exactly like json.loads apart from speed: anything the fast
+backend rejects (NaN, integers wider than 64 bits, malformed lines, ...) is
+retried with json.loads, so results and exceptions are the stdlib's.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _decode = msgspec.json.decode
+
+    def loads(data):
+        try:
+            return _decode(data)
+        except msgspec.DecodeError:
+            return json.loads(data)
+
+else:
+    BACKEND = "json"
+    loads = json.loads
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON, as Starlette's JSONResponse renders it."""
+    try:
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        if msgspec is not None:
+            return msgspec.json.encode(obj)
+    except (TypeError, ValueError, OverflowError):
+        pass  # e.g. integers wider than 64 bits; stdlib handles those
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,114 @@
+"""Incremental reader for large single-document JSON files (Gemini sessions).
+
+`iter_members` walks the top-level object of a file member by member, reading
+a chunk at a time, and can stream chosen array members item by item — so a
+session's `messages` are decoded one message at a time and memory stays
+bounded by the largest single message instead of the whole document.
+"""
+
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WS = " \t\r\n"
+_NUMBER_TAIL = set("0123456789.eE+-")
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class _Reader:
+    """Character buffer over a text file; `decode` returns one JSON value."""
+
+    def __init__(self, fh, chunk_size: int, max_chars: int | None):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.max_chars = max_chars
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.consumed = 0  # characters dropped from the front of buf
+
+    def fill(self) -> None:
+        if self.eof:
+            raise ValueError("Unexpected end of JSON document")
+        if self.max_chars is not None and self.consumed + len(self.buf) >= self.max_chars:
+            raise ValueError(f"Stopped reading after {self.max_chars} characters")
+        # Read at least as much as is buffered, so a value larger than a
+        # chunk is re-tried a logarithmic number of times, not linear.
+        chunk = self.fh.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+        self.consumed += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self.fill()
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"Expected {ch!r} at character {self.consumed + self.pos}")
+        self.pos += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                if not self.eof and (end == len(self.buf) or self._cut_number(value, end)):
+                    raise _NeedMore  # the value could continue in the next chunk
+            except (ValueError, _NeedMore):
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def _cut_number(self, value, end: int) -> bool:
+        # "62327." or "1e" decode as a shorter number; if nothing but number
+        # characters follow up to the end of the buffer, the rest is unread.
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return all(ch in _NUMBER_TAIL for ch in self.buf[end:])
+
+
+def iter_members(fh, stream=(), chunk_size: int = CHUNK_SIZE, max_chars: int | None = None):
+    """Yield (key, value) for each member of the JSON object in text file `fh`,
+    in document order. Array members whose key is in `stream` are not built:
+    each of their items is yielded as (key, item) instead. Raises ValueError
+    on malformed JSON, or once more than `max_chars` would have to be read."""
+    r = _Reader(fh, chunk_size, max_chars)
+    r.expect("{")
+    if r.peek() == "}":
+        return
+    while True:
+        key = r.decode()
+        if not isinstance(key, str):
+            raise ValueError("Object keys must be strings")
+        r.expect(":")
+        if key in stream and r.peek() == "[":
+            r.expect("[")
+            if r.peek() != "]":
+                while True:
+                    yield key, r.decode()
+                    if r.peek() != ",":
+                        break
+                    r.expect(",")
+            r.expect("]")
+        else:
+            yield key, r.decode()
+        if r.peek() != ",":
+            break
+        r.expect(",")
+    r.expect("}")
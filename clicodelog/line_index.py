@@ -0,0 +1,147 @@
+"""Byte-offset sidecar for reading a window of a JSONL session.
+
+For every Claude / Codex session that is opened with pagination we keep, in
+~/.clicodelog/offsets/, the byte offset of the line that starts each
+normalized message, plus the little parser state a window read needs
+(Claude summaries, the Codex session_meta). A page is then one seek and a
+parse of just the lines that make up its messages — from either end of the
+file, so newest-first pages never parse from the start.
+
+The sidecar is built once and extended when the log grows. Logs are
+append-only, so growth is verified by hashing the last bytes of the already
+indexed range; an inode change, a shrink or a tail mismatch means a rebuild.
+"""
+
+import hashlib
+import os
+import threading
+from array import array
+from pathlib import Path
+
+from .config import APP_DATA_DIR
+from .jsonlib import dumps, loads
+from .parsers import claude, codex
+
+OFFSETS_DIR = APP_DATA_DIR / "offsets"
+
+_VERSION = 1
+_TAIL_BYTES = 64  # bytes hashed at the end of the indexed range
+
+_PARSERS = {"claude-code": claude, "codex": codex}
+
+_locks: dict = {}
+_locks_guard = threading.Lock()
+
+
+def _sidecar(session_file: Path):
+    key = hashlib.sha1(str(session_file).encode()).hexdigest()
+    return OFFSETS_DIR / f"{key}.json", OFFSETS_DIR / f"{key}.off"
+
+
+def _tail_hash(fh, end: int) -> str:
+    start = max(0, end - _TAIL_BYTES)
+    fh.seek(start)
+    return hashlib.sha1(fh.read(end - start)).hexdigest()
+
+
+def _load(session_file: Path, source_id: str, st):
+    """Stored (header, offsets) if they still describe a prefix of the file."""
+    header_path, offsets_path = _sidecar(session_file)
+    try:
+        header = loads(header_path.read_bytes())
+        offsets = array("q")
+        offsets.frombytes(offsets_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if (header.get("version") != _VERSION or header.get("source") != source_id
+            or header.get("inode") != st.st_ino or header.get("end", 0) > st.st_size
+            or header.get("count") != len(offsets)):
+        return None
+    try:
+        with open(session_file, "rb") as fh:
+            if _tail_hash(fh, header["end"]) != header.get("tail"):
+                return None
+    except OSError:
+        return None
+    return header, offsets
+
+
+def _scan(session_file: Path, source_id: str, header: dict, offsets: array) -> None:
+    """Index complete lines from header['end'] onwards, updating both in place."""
+    parser = _PARSERS[source_id]
+    if source_id == "codex":
+        state = parser.new_state(header.get("session_meta"))
+        if header.get("last_role"):
+            state["last"] = {"role": header["last_role"]}
+    else:
+        state = parser.new_state()
+    pos = header["end"]
+    with open(session_file, "rb") as fh:
+        fh.seek(pos)
+        for line in fh:
+            try:
+                msg = parser.feed_entry(loads(line), state)
+            except ValueError:
+                if not line.endswith(b"\n"):
+                    break  # half-written last line; pick it up next time
+                msg = None
+            if msg is not None:
+                offsets.append(pos)
+            pos += len(line)
+        header["tail"] = _tail_hash(fh, pos)
+    header["end"] = pos
+    header["count"] = len(offsets)
+    header["summaries"] = header.get("summaries", []) + state["summaries"]
+    if source_id == "codex":
+        header["session_meta"] = state["session_meta"]
+        header["last_role"] = state["last"]["role"] if state["last"] else None
+
+
+def get_index(session_file: Path, source_id: str):
+    """(header, offsets) for a Claude / Codex session, built or extended as needed."""
+    with _locks_guard:
+        lock = _locks.setdefault(str(session_file), threading.Lock())
+    with lock:
+        st = os.stat(session_file)
+        loaded = _load(session_file, source_id, st)
+        if loaded and loaded[0]["end"] == st.st_size:
+            return loaded
+        if loaded:
+            header, offsets = loaded
+            appended_from = len(offsets)
+        else:
+            header = {"version": _VERSION, "source": source_id, "inode": st.st_ino, "end": 0}
+            offsets = array("q")
+            appended_from = 0
+        _scan(session_file, source_id, header, offsets)
+
+        header_path, offsets_path = _sidecar(session_file)
+        try:
+            OFFSETS_DIR.mkdir(parents=True, exist_ok=True)
+            with open(offsets_path, "ab" if appended_from else "wb") as fh:
+                offsets[appended_from:].tofile(fh)
+            tmp = header_path.with_suffix(".tmp")
+            tmp.write_bytes(dumps(header))
+            os.replace(tmp, header_path)
+        except OSError:
+            pass  # sidecar is only a cache; the in-memory index is still good
+        return header, offsets
+
+
+def read_window(session_file: Path, source_id: str, index, start: int, stop: int) -> list:
+    """Messages [start, stop) of a session, given its `get_index` result."""
+    header, offsets = index
+    stop = min(stop, len(offsets))
+    if start >= stop:
+        return []
+    begin = offsets[start]
+    end = offsets[stop] if stop < len(offsets) else header["end"]
+    with open(session_file, "rb") as fh:
+        fh.seek(begin)
+        data = fh.read(end - begin)
+    parser = _PARSERS[source_id]
+    if source_id == "codex":
+        state = parser.new_state(header.get("session_meta"))
+    else:
+        state = parser.new_state()
+    return parser.parse_lines(data.splitlines(keepends=True), state)
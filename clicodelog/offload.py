@@ -0,0 +1,60 @@
+"""Run the blocking part of a request off the event loop.
+
+Route handlers stay `async def` and hand disk walks, parsing and file writes
+to `run_blocking`, which runs them on a worker thread. Each kind of work has
+its own lane (ROUTE_LANES): a CapacityLimiter capping how many such calls
+run at once, so a burst of cold searches or exports cannot take every
+thread from cheap list requests, and writes to the small JSON stores run one
+at a time. A call that outlives REQUEST_TIMEOUT gets a 504; its thread is
+left to finish in the background. Inside a streaming response the status is
+already sent, so generators use `run_streamed`, which returns TIMED_OUT and
+lets them end the stream cleanly.
+"""
+
+import functools
+import inspect
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException
+
+from .config import REQUEST_TIMEOUT, ROUTE_LANES
+
+# anyio >= 4.1 renamed `cancellable` to `abandon_on_cancel`.
+_ABANDON = ("abandon_on_cancel" if "abandon_on_cancel" in inspect.signature(anyio.to_thread.run_sync).parameters
+            else "cancellable")
+
+_limiters: dict = {}
+
+TIMED_OUT = object()  # returned by run_streamed when the call timed out
+
+
+def _limiter(lane: str) -> anyio.CapacityLimiter:
+    # Created on first use, inside the running event loop.
+    limiter = _limiters.get(lane)
+    if limiter is None:
+        limiter = _limiters[lane] = anyio.CapacityLimiter(ROUTE_LANES[lane])
+    return limiter
+
+
+async def _run(lane: str, func, args, kwargs):
+    call = functools.partial(func, *args, **kwargs)
+    with anyio.fail_after(REQUEST_TIMEOUT):
+        return await anyio.to_thread.run_sync(call, limiter=_limiter(lane), **{_ABANDON: True})
+
+
+async def run_blocking(lane: str, func, *args, **kwargs):
+    """`func(*args, **kwargs)` on a worker thread in `lane`; 504 on timeout."""
+    try:
+        return await _run(lane, func, args, kwargs)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Request did not finish within {REQUEST_TIMEOUT}s")
+
+
+async def run_streamed(lane: str, func, *args, **kwargs):
+    """`run_blocking` for generators feeding a streaming response: TIMED_OUT
+    instead of an HTTPException, which could no longer become a 504."""
+    try:
+        return await _run(lane, func, args, kwargs)
+    except TimeoutError:
+        return TIMED_OUT
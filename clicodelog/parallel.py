@@ -0,0 +1,57 @@
+"""Fan the parsing part of a large index build out over worker processes.
+
+Used when many files need (re-)parsing at once — the first build after
+install or after the index was deleted. `iter_batches` splits the work into
+batches, runs `func(source_id, batch)` (a module-level function) in a
+process pool and yields each batch's results in order, so the caller can
+write them to its store as they arrive. Small jobs, and platforms where a
+pool cannot start, run inline. Builds of PARALLEL_MIN_FILES files or more
+report their throughput.
+"""
+
+import functools
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import INDEX_WORKERS, PARALLEL_MIN_FILES
+
+_BATCH = 32  # files per task
+_IN_FLIGHT = 2  # tasks queued per worker, bounding results held in memory
+
+
+def iter_batches(func, source_id: str, items: list, nbytes: int, label: str):
+    batches = [items[i:i + _BATCH] for i in range(0, len(items), _BATCH)]
+    workers = min(INDEX_WORKERS, len(batches))
+    big = len(items) >= PARALLEL_MIN_FILES
+    start = time.monotonic()
+    if big and workers > 1:
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, ValueError, NotImplementedError):
+            pool = None
+    else:
+        pool = None
+
+    if pool is None:
+        workers = 1
+        for batch in batches:
+            yield func(source_id, batch)
+    else:
+        call = functools.partial(func, source_id)
+        with pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(call, batch))
+                if len(pending) >= workers * _IN_FLIGHT:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    if big:
+        elapsed = max(time.monotonic() - start, 1e-6)
+        mb = nbytes / (1024 * 1024)
+        print(f"[Index] {label}: {len(items):,} files, {mb:,.1f} MB in {elapsed:.1f}s "
+              f"({len(items) / elapsed:,.0f} files/s, {mb / elapsed:,.1f} MB/s, {workers} process"
+              f"{'es' if workers > 1 else ''})")
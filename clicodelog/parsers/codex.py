@@ -1,138 +1,168 @@
 import json
 from pathlib import Path
 
+from ..jsonlib import loads
 
-def parse_codex_conversation(session_file: Path, session_id: str) -> dict:
-    """Parse OpenAI Codex JSONL conversation format."""
-    messages = []
-    summaries = []
-    session_meta = {}
 
-    with open(session_file, "r") as f:
-        for line_num, line in enumerate(f):
-            try:
-                entry = json.loads(line)
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                if entry_type == "session_meta":
-                    session_meta = entry.get("payload", {})
-
-                elif entry_type == "response_item":
-                    payload = entry.get("payload", {})
-                    role = payload.get("role")
-                    payload_type = payload.get("type")
-                    model = session_meta.get("model_provider", "openai")
-
-                    if payload_type == "message" and role == "user":
-                        text_parts = []
-                        for block in payload.get("content", []):
-                            if isinstance(block, dict) and block.get("type") == "input_text":
-                                text = block.get("text", "")
-                                if (
-                                    text.startswith("<")
-                                    or text.startswith("# AGENTS.md")
-                                    or text.startswith("<environment_context")
-                                    or "<permissions instructions>" in text
-                                    or len(text) > 1000
-                                ):
-                                    continue
-                                text_parts.append(text)
-                        if text_parts:
-                            messages.append({
-                                "role": "user",
-                                "content": "\n".join(text_parts),
-                                "timestamp": timestamp,
-                            })
-
-                    elif payload_type == "message" and role == "assistant":
-                        text_parts = [
-                            block.get("text", "")
-                            for block in payload.get("content", [])
-                            if isinstance(block, dict) and block.get("type") == "output_text"
-                        ]
-                        if text_parts:
-                            messages.append({
-                                "role": "assistant",
-                                "content": "\n".join(text_parts),
-                                "timestamp": timestamp,
-                                "model": model,
-                            })
-
-                    elif payload_type == "function_call":
-                        messages.append({
-                            "role": "assistant",
-                            "content": "",
-                            "timestamp": timestamp,
-                            "tool_uses": [{"name": payload.get("name", ""), "input": payload.get("arguments", "")}],
-                            "model": model,
-                        })
-
-                    elif payload_type == "reasoning":
-                        if payload.get("encrypted_content"):
-                            thinking_text = (
-                                "[Reasoning content is encrypted and cannot be displayed]\n\n"
-                                "OpenAI Codex encrypts extended thinking for privacy."
-                            )
-                        else:
-                            parts = [
-                                part.get("text", "")
-                                for part in payload.get("summary", [])
-                                if isinstance(part, dict) and part.get("type") == "summary_text"
-                            ]
-                            thinking_text = "\n".join(parts)
-
-                        if thinking_text:
-                            messages.append({
-                                "role": "assistant",
-                                "content": "",
-                                "thinking": thinking_text.strip(),
-                                "timestamp": timestamp,
-                                "model": model,
-                            })
-
-                elif entry_type == "event_msg":
-                    payload = entry.get("payload", {})
-                    if payload.get("type") == "agent_message":
-                        messages.append({
-                            "role": "assistant",
-                            "content": payload.get("message", ""),
-                            "timestamp": timestamp,
-                            "model": session_meta.get("model_provider", "openai"),
-                        })
-
-                elif entry_type == "turn_context":
-                    payload = entry.get("payload", {})
-                    if payload.get("model"):
-                        session_meta["model"] = payload.get("model")
-
-            except json.JSONDecodeError as e:
-                print(f"Error parsing line {line_num}: {e}")
-                continue
+def new_state(session_meta: dict | None = None) -> dict:
+    # `last` is the most recent consolidated message: tool_use / thinking-only
+    # assistant entries are merged into it instead of becoming new messages.
+    return {"session_meta": dict(session_meta or {}), "summaries": [], "last": None}
+
+
+def _entry_message(entry: dict, session_meta: dict) -> dict | None:
+    entry_type = entry.get("type")
+    timestamp = entry.get("timestamp")
+
+    if entry_type == "session_meta":
+        session_meta.clear()
+        session_meta.update(entry.get("payload", {}))
+
+    elif entry_type == "response_item":
+        payload = entry.get("payload", {})
+        role = payload.get("role")
+        payload_type = payload.get("type")
+        model = session_meta.get("model_provider", "openai")
+
+        if payload_type == "message" and role == "user":
+            text_parts = []
+            for block in payload.get("content", []):
+                if isinstance(block, dict) and block.get("type") == "input_text":
+                    text = block.get("text", "")
+                    if (
+                        text.startswith("<")
+                        or text.startswith("# AGENTS.md")
+                        or text.startswith("<environment_context")
+                        or "<permissions instructions>" in text
+                        or len(text) > 1000
+                    ):
+                        continue
+                    text_parts.append(text)
+            if text_parts:
+                return {
+                    "role": "user",
+                    "content": "\n".join(text_parts),
+                    "timestamp": timestamp,
+                }
+
+        elif payload_type == "message" and role == "assistant":
+            text_parts = [
+                block.get("text", "")
+                for block in payload.get("content", [])
+                if isinstance(block, dict) and block.get("type") == "output_text"
+            ]
+            if text_parts:
+                return {
+                    "role": "assistant",
+                    "content": "\n".join(text_parts),
+                    "timestamp": timestamp,
+                    "model": model,
+                }
+
+        elif payload_type == "function_call":
+            return {
+                "role": "assistant",
+                "content": "",
+                "timestamp": timestamp,
+                "tool_uses": [{"name": payload.get("name", ""), "input": payload.get("arguments", "")}],
+                "model": model,
+            }
+
+        elif payload_type == "reasoning":
+            if payload.get("encrypted_content"):
+                thinking_text = (
+                    "[Reasoning content is encrypted and cannot be displayed]\n\n"
+                    "OpenAI Codex encrypts extended thinking for privacy."
+                )
+            else:
+                parts = [
+                    part.get("text", "")
+                    for part in payload.get("summary", [])
+                    if isinstance(part, dict) and part.get("type") == "summary_text"
+                ]
+                thinking_text = "\n".join(parts)
+
+            if thinking_text:
+                return {
+                    "role": "assistant",
+                    "content": "",
+                    "thinking": thinking_text.strip(),
+                    "timestamp": timestamp,
+                    "model": model,
+                }
+
+    elif entry_type == "event_msg":
+        payload = entry.get("payload", {})
+        if payload.get("type") == "agent_message":
+            return {
+                "role": "assistant",
+                "content": payload.get("message", ""),
+                "timestamp": timestamp,
+                "model": session_meta.get("model_provider", "openai"),
+            }
+
+    elif entry_type == "turn_context":
+        payload = entry.get("payload", {})
+        if payload.get("model"):
+            session_meta["model"] = payload.get("model")
+
+    return None
+
+
+def feed_entry(entry: dict, state: dict) -> dict | None:
+    """Consume one decoded JSONL entry; return the new message it starts, or
+    None if it produced nothing or was merged into the previous message."""
+    msg = _entry_message(entry, state["session_meta"])
+    if msg is None:
+        return None
 
     # Merge consecutive assistant-only tool_use / thinking blocks into the previous message
-    consolidated = []
-    for msg in messages:
-        if msg["role"] == "assistant" and consolidated and consolidated[-1]["role"] == "assistant":
-            prev = consolidated[-1]
-            if msg.get("tool_uses") and not msg.get("content"):
-                prev.setdefault("tool_uses", []).extend(msg["tool_uses"])
-                continue
-            if msg.get("thinking") and not msg.get("content"):
-                if prev.get("thinking"):
-                    prev["thinking"] += "\n" + msg["thinking"]
-                else:
-                    prev["thinking"] = msg["thinking"]
-                continue
-        consolidated.append(msg)
+    prev = state["last"]
+    if msg["role"] == "assistant" and prev is not None and prev["role"] == "assistant":
+        if msg.get("tool_uses") and not msg.get("content"):
+            prev.setdefault("tool_uses", []).extend(msg["tool_uses"])
+            return None
+        if msg.get("thinking") and not msg.get("content"):
+            if prev.get("thinking"):
+                prev["thinking"] += "\n" + msg["thinking"]
+            else:
+                prev["thinking"] = msg["thinking"]
+            return None
+    state["last"] = msg
+    return msg
+
+
+def parse_lines(lines, state: dict) -> list:
+    """Feed raw JSONL lines through `state`; return the messages produced."""
+    messages = []
+    for line_num, line in enumerate(lines):
+        try:
+            msg = feed_entry(loads(line), state)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing line {line_num}: {e}")
+            continue
+        if msg is not None:
+            messages.append(msg)
+    return messages
+
+
+def session_meta_summary(session_meta: dict) -> dict:
+    return {
+        "cwd": session_meta.get("cwd"),
+        "model": session_meta.get("model"),
+        "cli_version": session_meta.get("cli_version"),
+    }
+
+
+def parse_codex_conversation(session_file: Path, session_id: str) -> dict:
+    """Parse OpenAI Codex JSONL conversation format."""
+    state = new_state()
+    with open(session_file, "r") as f:
+        messages = parse_lines(f, state)
 
     return {
-        "summaries": summaries,
-        "messages": consolidated,
+        "summaries": state["summaries"],
+        "messages": messages,
         "session_id": session_id,
-        "meta": {
-            "cwd": session_meta.get("cwd"),
-            "model": session_meta.get("model"),
-            "cli_version": session_meta.get("cli_version"),
-        },
+        "meta": session_meta_summary(state["session_meta"]),
     }
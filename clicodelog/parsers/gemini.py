@@ -1,52 +1,74 @@
-import json
 from pathlib import Path
 
+from ..jsonstream import iter_members
+
+META_KEYS = ("sessionId", "projectHash", "startTime", "lastUpdated")
 
-def parse_gemini_conversation(session_file: Path, session_id: str) -> dict:
-    """Parse Google Gemini JSON conversation format."""
-    messages = []
 
+def iter_raw_messages(session_file: Path, meta: dict | None = None):
+    """Yield the items of a session's `messages` array one at a time, without
+    loading the document. Other top-level members land in `meta` as they are
+    read (members after `messages` only once the generator is exhausted)."""
     with open(session_file, "r") as f:
-        data = json.load(f)
-
-    session_meta = {
-        "sessionId": data.get("sessionId"),
-        "projectHash": data.get("projectHash"),
-        "startTime": data.get("startTime"),
-        "lastUpdated": data.get("lastUpdated"),
-    }
-
-    for msg in data.get("messages", []):
-        msg_type = msg.get("type")
-        timestamp = msg.get("timestamp")
-        content = msg.get("content", "")
-
-        if msg_type == "user":
-            messages.append({"role": "user", "content": content, "timestamp": timestamp})
-
-        elif msg_type == "gemini":
-            thinking_parts = []
-            for thought in msg.get("thoughts", []):
-                if isinstance(thought, dict):
-                    subject = thought.get("subject", "")
-                    desc = thought.get("description", "")
-                    if subject or desc:
-                        thinking_parts.append(f"**{subject}**: {desc}" if subject else desc)
-
-            tool_uses = [
-                {"name": tc.get("name", ""), "input": tc.get("args", {})}
-                for tc in msg.get("toolCalls", [])
-                if isinstance(tc, dict)
-            ]
-
-            messages.append({
-                "role": "assistant",
-                "content": content,
-                "thinking": "\n".join(thinking_parts) if thinking_parts else None,
-                "tool_uses": tool_uses if tool_uses else None,
-                "timestamp": timestamp,
-                "model": msg.get("model", "gemini"),
-                "tokens": msg.get("tokens"),
-            })
-
-    return {"summaries": [], "messages": messages, "session_id": session_id, "meta": session_meta}
+        for key, value in iter_members(f, stream=("messages",)):
+            if key == "messages":
+                if isinstance(value, dict):
+                    yield value
+            elif meta is not None:
+                meta[key] = value
+
+
+def normalize_message(msg: dict) -> dict | None:
+    """The UI message for one raw Gemini message, or None if it has none."""
+    msg_type = msg.get("type")
+    timestamp = msg.get("timestamp")
+    content = msg.get("content", "")
+
+    if msg_type == "user":
+        return {"role": "user", "content": content, "timestamp": timestamp}
+
+    if msg_type == "gemini":
+        thinking_parts = []
+        for thought in msg.get("thoughts", []):
+            if isinstance(thought, dict):
+                subject = thought.get("subject", "")
+                desc = thought.get("description", "")
+                if subject or desc:
+                    thinking_parts.append(f"**{subject}**: {desc}" if subject else desc)
+
+        tool_uses = [
+            {"name": tc.get("name", ""), "input": tc.get("args", {})}
+            for tc in msg.get("toolCalls", [])
+            if isinstance(tc, dict)
+        ]
+
+        return {
+            "role": "assistant",
+            "content": content,
+            "thinking": "\n".join(thinking_parts) if thinking_parts else None,
+            "tool_uses": tool_uses if tool_uses else None,
+            "timestamp": timestamp,
+            "model": msg.get("model", "gemini"),
+            "tokens": msg.get("tokens"),
+        }
+
+    return None
+
+
+def iter_messages(session_file: Path, meta: dict | None = None):
+    """Normalized messages of a session as a generator (see iter_raw_messages)."""
+    for raw in iter_raw_messages(session_file, meta):
+        msg = normalize_message(raw)
+        if msg is not None:
+            yield msg
+
+
+def session_meta_summary(meta: dict) -> dict:
+    return {key: meta.get(key) for key in META_KEYS}
+
+
+def parse_gemini_conversation(session_file: Path, session_id: str) -> dict:
+    """Parse Google Gemini JSON conversation format."""
+    meta: dict = {}
+    messages = list(iter_messages(session_file, meta))
+    return {"summaries": [], "messages": messages, "session_id": session_id, "meta": session_meta_summary(meta)}
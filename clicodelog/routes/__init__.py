@@ -1,10 +1,13 @@
 from fastapi import APIRouter
 
 from .bookmarks import router as bookmarks_router
+from .dataset import router as dataset_router
 from .export import router as export_router
+from .files import router as files_router
 from .projects import router as projects_router
 from .search import router as search_router
 from .sources import router as sources_router
+from .stats import router as stats_router
 from .sync import router as sync_router
 
 router = APIRouter()
@@ -14,3 +17,6 @@ router.include_router(search_router)
 router.include_router(export_router)
 router.include_router(sync_router)
 router.include_router(bookmarks_router)
+router.include_router(dataset_router)
+router.include_router(stats_router)
+router.include_router(files_router)
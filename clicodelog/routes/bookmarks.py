@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request
 
 from ..bookmarks import add_bookmark, load_bookmarks, remove_bookmark
+from ..offload import run_blocking
 
 router = APIRouter()
 
@@ -8,15 +9,15 @@ router = APIRouter()
 @router.get("/api/bookmarks")
 async def api_list_bookmarks():
     # Newest first
-    return sorted(load_bookmarks(), key=lambda b: b.get("created", ""), reverse=True)
+    return sorted(await run_blocking("read", load_bookmarks), key=lambda b: b.get("created", ""), reverse=True)
 
 
 @router.post("/api/bookmarks")
 async def api_add_bookmark(request: Request):
     body = await request.json()
-    return add_bookmark(body)
+    return await run_blocking("write", add_bookmark, body)
 
 
 @router.delete("/api/bookmarks/{bid:path}")
 async def api_remove_bookmark(bid: str):
-    return remove_bookmark(bid)
+    return await run_blocking("write", remove_bookmark, bid)
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..config import SOURCES
+from ..dataset import available, dataset_job, start_dataset_job
+
+router = APIRouter()
+
+
+@router.post("/api/dataset")
+async def api_dataset_export(source: Optional[str] = None):
+    # Same work as `clicodelog export-dataset` (without the sync), run as a
+    # background job; a request while one is running gets that job back.
+    if not available():
+        return JSONResponse({"error": 'Parquet export needs pyarrow: pip install "clicodelog[dataset]"'},
+                            status_code=503)
+    if source is not None and source not in SOURCES:
+        return JSONResponse({"error": "Unknown source"}, status_code=400)
+    job = start_dataset_job([source] if source else None)
+    return JSONResponse({"status": "started", "job": job}, status_code=202)
+
+
+@router.get("/api/dataset")
+async def api_dataset_status():
+    job = dataset_job()
+    if job is None:
+        return JSONResponse({"error": "No dataset export has run"}, status_code=404)
+    return job
@@ -1,57 +1,88 @@
 from typing import Optional
 
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from .. import sync as _sync
-from ..conversation import get_conversation
+from ..config import SOURCES
+from ..export import ARCHIVES, FORMATS, archive_members, iter_archive, iter_export
+from ..offload import TIMED_OUT, run_blocking, run_streamed
 
 router = APIRouter()
 
 
+async def _pull(chunks):
+    """Drive a blocking chunk generator on the export lane, one worker-thread
+    call per chunk, so a slow disk never stalls the event loop. A chunk that
+    times out ends the download there (the status line is long sent)."""
+    done = object()
+    try:
+        while True:
+            chunk = await run_streamed("export", next, chunks, done)
+            if chunk is TIMED_OUT:
+                print("(export stopped: a chunk did not finish in time)")
+                return
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        try:
+            chunks.close()
+        except ValueError:
+            pass  # still running on a worker thread abandoned after a timeout
+
+
+def _bad_request(source_id: str, fmt: str, archive: str | None = None):
+    if source_id not in SOURCES:
+        return JSONResponse({"error": "Unknown source"}, status_code=400)
+    if fmt not in FORMATS:
+        return JSONResponse({"error": f"format must be one of: {', '.join(FORMATS)}"}, status_code=400)
+    if archive is not None and archive not in ARCHIVES:
+        return JSONResponse({"error": f"archive must be one of: {', '.join(ARCHIVES)}"}, status_code=400)
+    return None
+
+
 @router.get("/api/projects/{project_id}/sessions/{session_id}/export")
-async def api_export(project_id: str, session_id: str, source: Optional[str] = None):
+async def api_export(project_id: str, session_id: str, source: Optional[str] = None, format: str = "txt"):
     source_id = source or _sync.current_source
-    conv = get_conversation(project_id, session_id, source_id)
-
-    if "error" in conv:
-        return JSONResponse(conv, status_code=404)
-
-    lines = ["=" * 60, f"Session: {session_id}",
-             f"Project: {project_id.replace('-', '/').lstrip('/')}", "=" * 60, ""]
-
-    if conv.get("summaries"):
-        lines.append("SUMMARIES:")
-        for s in conv["summaries"]:
-            lines.append(f"  • {s}")
-        lines += ["", "-" * 60, ""]
-
-    for msg in conv.get("messages", []):
-        lines.append(f"[{msg['role'].upper()}] {msg.get('timestamp', '')}")
-        if msg.get("model"):
-            lines.append(f"Model: {msg['model']}")
-        lines.append("-" * 40)
-        if msg.get("content"):
-            lines.append(msg["content"])
-        if msg.get("thinking"):
-            lines += ["", "--- THINKING ---", msg["thinking"], "--- END THINKING ---"]
-        if msg.get("tool_uses"):
-            lines.append("")
-            for tool in msg["tool_uses"]:
-                lines.append(f"[TOOL: {tool['name']}]")
-                if isinstance(tool.get("input"), dict):
-                    for k, v in tool["input"].items():
-                        val = str(v)
-                        lines.append(f"  {k}: {val[:200]}{'...' if len(val) > 200 else ''}")
-                else:
-                    lines.append(f"  {tool.get('input', '')}")
-        if msg.get("usage"):
-            tokens = msg["usage"].get("input_tokens", 0) + msg["usage"].get("output_tokens", 0)
-            lines.append(f"\n[Tokens: {tokens}]")
-        lines += ["", "=" * 60, ""]
-
-    return Response(
-        content="\n".join(lines),
-        media_type="text/plain",
-        headers={"Content-Disposition": f"attachment; filename={session_id}.txt"},
+    error = _bad_request(source_id, format)
+    if error:
+        return error
+    chunks = await run_blocking("export", iter_export, project_id, session_id, source_id, format)
+    if chunks is None:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+
+    return StreamingResponse(
+        _pull(chunks),
+        media_type=FORMATS[format][0],
+        headers={"Content-Disposition": f"attachment; filename={session_id}.{format}"},
     )
+
+
+async def _archive_response(source_id: str, project_id: Optional[str], fmt: str, archive: str, name: str):
+    error = _bad_request(source_id, fmt, archive)
+    if error:
+        return error
+    members = await run_blocking("export", archive_members, source_id, project_id)
+    if not members:
+        return JSONResponse({"error": "No sessions to export"}, status_code=404)
+    media_type, ext = ARCHIVES[archive]
+    return StreamingResponse(
+        _pull(iter_archive(members, source_id, fmt, archive)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={name}.{ext}"},
+    )
+
+
+@router.get("/api/projects/{project_id}/export")
+async def api_export_project(project_id: str, source: Optional[str] = None, format: str = "txt",
+                             archive: str = "zip"):
+    """Every session of a project, rendered in `format`, as a zip / tar.gz."""
+    return await _archive_response(source or _sync.current_source, project_id, format, archive, project_id)
+
+
+@router.get("/api/export")
+async def api_export_source(source: Optional[str] = None, format: str = "txt", archive: str = "zip"):
+    """Every session of a source, rendered in `format`, as a zip / tar.gz."""
+    source_id = source or _sync.current_source
+    return await _archive_response(source_id, None, format, archive, source_id)
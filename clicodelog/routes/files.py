@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from .. import sync as _sync
+from ..catalog import file_touches
+from ..config import SOURCES
+from ..offload import run_blocking
+
+router = APIRouter()
+
+
+@router.get("/api/files")
+async def api_files(path: Optional[str] = None, source: Optional[str] = None, limit: int = 50):
+    """Sessions whose tool calls touched `path` (a file, or any file under a
+    directory), newest first, with the message index of every touch."""
+    source_id = source or _sync.current_source
+    if source_id not in SOURCES:
+        return JSONResponse({"error": "Unknown source"}, status_code=400)
+    if not path or not path.strip():
+        return JSONResponse({"error": "path is required"}, status_code=400)
+    result = await run_blocking("read", file_touches, source_id, path.strip(), max(1, min(limit, 500)))
+    return {"source": source_id, "path": path.strip(), **result}
@@ -1,19 +1,30 @@
+import asyncio
+import json
+import os
 from typing import Optional
 
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from .. import sync as _sync
-from ..conversation import get_conversation
+from ..conversation import get_conversation, live_session_file, read_session_file
 from ..metadata import get_project_meta_key, load_project_meta, save_project_meta
+from ..offload import TIMED_OUT, run_blocking, run_streamed
 from ..projects import get_projects
 from ..sessions import get_sessions, get_subagent_sessions
 
 router = APIRouter()
 
+_LIVE_POLL = 0.5  # seconds between checks of a live session file
+_KEEPALIVE = 15  # seconds of silence before an SSE comment is sent
+# Sources whose last message can change in place: Codex merges tool calls into
+# the previous message, Gemini rewrites the whole document. Claude only appends.
+_MUTABLE_TAIL = ("codex", "gemini")
+
 
 @router.get("/api/projects")
 async def api_projects(source: Optional[str] = None):
-    projects = get_projects(source or _sync.current_source)
+    projects = await run_blocking("read", get_projects, source or _sync.current_source)
     flt = _sync.folder_filter
     if flt:
         needle = flt.lower()
@@ -28,23 +39,91 @@ async def api_projects(source: Optional[str] = None):
 
 @router.get("/api/projects/{project_id}/sessions")
 async def api_sessions(project_id: str, source: Optional[str] = None):
-    return get_sessions(project_id, source or _sync.current_source)
+    return await run_blocking("read", get_sessions, project_id, source or _sync.current_source)
 
 
 @router.get("/api/projects/{project_id}/sessions/{session_id}/subagents")
 async def api_subagents(project_id: str, session_id: str, source: Optional[str] = None):
-    return get_subagent_sessions(project_id, session_id, source or _sync.current_source)
+    return await run_blocking("read", get_subagent_sessions, project_id, session_id, source or _sync.current_source)
 
 
 @router.get("/api/projects/{project_id}/sessions/{session_id}")
-async def api_conversation(project_id: str, session_id: str, source: Optional[str] = None):
-    return get_conversation(project_id, session_id, source or _sync.current_source)
+async def api_conversation(
+    project_id: str,
+    session_id: str,
+    source: Optional[str] = None,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    order: str = "oldest",
+):
+    # Without offset/limit the whole conversation is returned, as before.
+    return await run_blocking("parse", get_conversation, project_id, session_id, source or _sync.current_source,
+                              offset=offset, limit=limit, order=order)
+
+
+@router.get("/api/projects/{project_id}/sessions/{session_id}/stream")
+async def api_conversation_stream(project_id: str, session_id: str, source: Optional[str] = None, after: int = 0):
+    """Server-Sent Events following a session as it is written. `after` is the
+    number of messages the client already has. Each `messages` event carries
+    {"start", "messages", "total"}: messages from index `start` on, where a
+    `start` below the client's count replaces its last message (only for
+    sources in _MUTABLE_TAIL). A shrunk or replaced file, or a read that
+    times out, sends `reset`, after which the client should reload the
+    conversation."""
+    source_id = source or _sync.current_source
+    path = await run_blocking("read", live_session_file, project_id, session_id, source_id)
+    if path is None:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+
+    async def events():
+        sent = max(after, 0)
+        last_msg = None
+        seen = None
+        quiet = 0.0
+        while True:
+            try:
+                st = os.stat(path)
+            except OSError:
+                yield f"event: reset\ndata: {json.dumps({'error': 'Session file is gone'})}\n\n"
+                return
+            if (st.st_ino, st.st_size, st.st_mtime_ns) != seen:
+                seen = (st.st_ino, st.st_size, st.st_mtime_ns)
+                conv = await run_streamed("parse", read_session_file, path, session_id, source_id)
+                if conv is TIMED_OUT:
+                    yield f"event: reset\ndata: {json.dumps({'error': 'Timed out reading the session'})}\n\n"
+                    return
+                msgs = conv.get("messages", [])
+                if len(msgs) < sent:
+                    yield f"event: reset\ndata: {json.dumps({'total': len(msgs)})}\n\n"
+                    return
+                # The client's last message may since have been extended; on
+                # the first pass we cannot tell, so it is re-sent then.
+                start = sent
+                if sent and source_id in _MUTABLE_TAIL and (last_msg is None or msgs[sent - 1] != last_msg):
+                    start = sent - 1
+                if start < len(msgs):
+                    payload = {"start": start, "messages": msgs[start:], "total": len(msgs)}
+                    yield f"event: messages\ndata: {json.dumps(payload)}\n\n"
+                    quiet = 0.0
+                sent = len(msgs)
+                last_msg = msgs[-1] if msgs else None
+            elif quiet >= _KEEPALIVE:
+                yield ": keepalive\n\n"
+                quiet = 0.0
+            await asyncio.sleep(_LIVE_POLL)
+            quiet += _LIVE_POLL
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/api/projects/{project_id}/meta")
 async def api_get_project_meta(project_id: str, source: Optional[str] = None):
     source_id = source or _sync.current_source
-    pm = load_project_meta().get(get_project_meta_key(project_id, source_id), {})
+    pm = (await run_blocking("read", load_project_meta)).get(get_project_meta_key(project_id, source_id), {})
     return {"custom_name": pm.get("custom_name", ""), "tags": pm.get("tags", [])}
 
 
@@ -52,15 +131,18 @@ async def api_get_project_meta(project_id: str, source: Optional[str] = None):
 async def api_set_project_meta(project_id: str, request: Request, source: Optional[str] = None):
     source_id = source or _sync.current_source
     body = await request.json()
+    await run_blocking("write", _update_project_meta, get_project_meta_key(project_id, source_id), body)
+    return {"status": "success"}
+
+
+def _update_project_meta(key: str, body: dict) -> None:
     meta = load_project_meta()
-    key = get_project_meta_key(project_id, source_id)
     meta.setdefault(key, {})
     if "custom_name" in body:
         meta[key]["custom_name"] = body["custom_name"]
     if "tags" in body:
         meta[key]["tags"] = body["tags"]
     save_project_meta(meta)
-    return {"status": "success"}
 
 
 @router.get("/api/tags")
@@ -69,7 +151,7 @@ async def api_get_tags(source: Optional[str] = None):
     prefix = f"{source_id}:"
     tags = {
         tag
-        for key, pm in load_project_meta().items()
+        for key, pm in (await run_blocking("read", load_project_meta)).items()
         if key.startswith(prefix)
         for tag in pm.get("tags", [])
     }
@@ -1,17 +1,19 @@
 from typing import Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
+from .. import fulltext
 from .. import sync as _sync
 from ..config import DATA_DIR, SOURCES
-from ..search_index import search_index
+from ..offload import run_blocking
+from ..search_index import index_status, search_index
 from ..utils import encode_path_id, get_codex_cwd, get_gemini_project_hash
 
 router = APIRouter()
 
-# Cap how much of a file we read for content matching. Session logs can be
-# hundreds of MB; reading them whole would blow up memory. The session id and
-# project name are matched without reading the file at all.
+# Cap how much of a file we read for content matching when SQLite has no FTS5
+# (normally content search goes through the full-text index, uncapped).
+# Session logs can be hundreds of MB; reading them whole would blow up memory.
 _MAX_CONTENT_SCAN = 8 * 1024 * 1024  # 8 MB
 
 
@@ -34,13 +36,24 @@ def _content_match(path, needle: str) -> bool:
 
 
 @router.get("/api/search")
-async def api_search(q: Optional[str] = None, source: Optional[str] = None):
+async def api_search(response: Response, q: Optional[str] = None, source: Optional[str] = None):
     query = (q or "").strip().lower()
     source_id = source or _sync.current_source
 
     if not query or source_id not in SOURCES:
         return []
-
+    results = await run_blocking("search", _search, query, source_id)
+    # Results may come from an index that is being refreshed in the background;
+    # say how current it was.
+    status = index_status(source_id)
+    response.headers["X-Index-Generation"] = str(status["generation"])
+    if status["age"] is not None:
+        response.headers["X-Index-Age"] = f"{status['age']:.1f}"
+    response.headers["X-Index-Refreshing"] = "1" if status["refreshing"] else "0"
+    return results
+
+
+def _search(query: str, source_id: str) -> list:
     data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
     if not data_dir.exists():
         return []
@@ -51,8 +64,12 @@ async def api_search(q: Optional[str] = None, source: Optional[str] = None):
     if indexed:
         return indexed[:50]
 
-    # Fallback: bounded full-text content scan for matches inside transcripts
-    # that the metadata index can't see.
+    # Fallback: full-text index over message bodies for matches inside
+    # transcripts that the metadata index can't see.
+    if fulltext.available():
+        return fulltext.search(query, source_id, limit=50)
+
+    # No FTS5 in this SQLite build: bounded content scan instead.
     results = []
     seen = set()
 
@@ -0,0 +1,69 @@
+import calendar
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from .. import sync as _sync
+from ..catalog import tool_stats
+from ..config import SOURCES
+from ..conversation import _catalog_project_id
+from ..offload import run_blocking
+from ..usage import GROUPS, usage_stats
+
+router = APIRouter()
+
+
+def _day(value: Optional[str]) -> Optional[str]:
+    return date.fromisoformat(value).isoformat() if value else None
+
+
+@router.get("/api/stats/usage")
+async def api_usage(source: Optional[str] = None, group: str = "project", month: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None, project: Optional[str] = None):
+    """Tokens and estimated cost grouped by `group` (comma-separated: project,
+    session, day, model). `month=YYYY-MM` (or `month=current`) is shorthand
+    for since/until (YYYY-MM-DD, inclusive)."""
+    source_id = source or _sync.current_source
+    if source_id not in SOURCES:
+        return JSONResponse({"error": "Unknown source"}, status_code=400)
+    group_by = tuple(dict.fromkeys(g.strip() for g in group.split(",") if g.strip()))
+    if not group_by or any(g not in GROUPS for g in group_by):
+        return JSONResponse({"error": f"group must be a comma-separated subset of: {', '.join(GROUPS)}"},
+                            status_code=400)
+    try:
+        if month:
+            first = date.today().replace(day=1) if month == "current" else date.fromisoformat(f"{month}-01")
+            since = first.isoformat()
+            until = first.replace(day=calendar.monthrange(first.year, first.month)[1]).isoformat()
+        since, until = _day(since), _day(until)
+    except ValueError:
+        return JSONResponse({"error": "month must be YYYY-MM; since / until YYYY-MM-DD"}, status_code=400)
+    project_id = None
+    if project:
+        project_id = _catalog_project_id(project, source_id)
+        if project_id is None:
+            return JSONResponse({"error": "Unknown project"}, status_code=404)
+    return await run_blocking("read", usage_stats, source_id, group_by, since, until, project_id)
+
+
+@router.get("/api/stats/tools")
+async def api_tools(source: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                    project: Optional[str] = None, limit: int = 20):
+    """Per-tool call counts, per-project tool mix and the slowest / largest
+    tool calls (duration from call to result; size of input + output)."""
+    source_id = source or _sync.current_source
+    if source_id not in SOURCES:
+        return JSONResponse({"error": "Unknown source"}, status_code=400)
+    try:
+        since, until = _day(since), _day(until)
+    except ValueError:
+        return JSONResponse({"error": "since / until must be YYYY-MM-DD"}, status_code=400)
+    project_id = None
+    if project:
+        project_id = _catalog_project_id(project, source_id)
+        if project_id is None:
+            return JSONResponse({"error": "Unknown project"}, status_code=404)
+    stats = await run_blocking("read", tool_stats, source_id, project_id, since, until, max(1, min(limit, 500)))
+    return {"source": source_id, "since": since, "until": until, **stats}
@@ -1,31 +1,66 @@
+import asyncio
+import json
 from typing import Optional
 
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from .. import sync as _sync
 from ..config import DATA_DIR, SOURCES
+from ..conv_cache import cache_stats
+from ..sync_jobs import active_job, get_job, is_done, start_sync_job
 
 router = APIRouter()
 
+_POLL = 0.5  # seconds between progress updates
+
 
 @router.post("/api/sync")
-async def api_sync(source: Optional[str] = None):
+async def api_sync(source: Optional[str] = None, wait: bool = False):
+    # The copy runs as a background job; the event loop is never blocked.
+    # Concurrent requests for the same source share one job. With ?wait=true
+    # the response is held (without blocking other requests) until it ends.
     source_id = source or _sync.current_source
-    try:
-        ran = _sync.sync_data(source_id=source_id, silent=True)
-        if not ran:
-            return JSONResponse(
-                {
-                    "status": "error",
-                    "message": f"Sync did not run for source '{source_id}'.",
-                },
-                status_code=503,
-            )
-        last = _sync.last_sync_time.get(source_id)
-        return {"status": "success", "source": source_id, "last_sync": last.isoformat() if last else None}
-    except Exception as e:
-        return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
+    job = start_sync_job(source_id)
+    if not wait:
+        return JSONResponse({"status": "started", "job": job}, status_code=202)
+
+    while not is_done(job):
+        await asyncio.sleep(_POLL)
+        job = get_job(job["id"])
+    if job["status"] != "success":
+        return JSONResponse({"status": "error", "message": job["message"], "job": job}, status_code=503)
+    return {"status": "success", "source": source_id, "last_sync": job["last_sync"], "job": job}
+
+
+@router.get("/api/sync/jobs/{job_id}")
+async def api_sync_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown sync job"}, status_code=404)
+    return job
+
+
+@router.get("/api/sync/jobs/{job_id}/events")
+async def api_sync_job_events(job_id: str):
+    """Server-Sent Events: one `data:` frame with the job view per update,
+    ending after the frame that reports success or error."""
+    async def events():
+        while True:
+            job = get_job(job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Unknown sync job'})}\n\n"
+                return
+            yield f"data: {json.dumps(job)}\n\n"
+            if is_done(job):
+                return
+            await asyncio.sleep(_POLL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/api/status")
@@ -36,6 +71,12 @@ async def api_status(source: Optional[str] = None):
     return {
         "source": source_id,
         "last_sync": last.isoformat() if last else None,
-        "sync_interval_hours": 1,
+        # "watch": copied as sources change, with a full sync every
+        # sync_interval_hours to catch missed events; "interval": polled.
+        "sync_mode": "watch" if _sync.watch_backend else "interval",
+        "watch_backend": _sync.watch_backend,
+        "sync_interval_hours": _sync.sync_interval / 3600,
         "data_dir": str(data_dir),
+        "sync_job": active_job(source_id),
+        "conversation_cache": cache_stats(),
     }
@@ -1,198 +1,175 @@
-"""Lightweight, auto-maintained metadata index for fast session search.
-
-Stores one small record per session (id, project, cwd, summary, timestamps,
-size, mtime) in ~/.clicodelog/search_index.json. Lets search match by session
-id / cwd / summary / project name instantly without walking and reading files.
-
-Freshness strategy (no background process, always correct):
-  * Full incremental refresh on startup and after every sync.
-  * A cheap TTL-guarded incremental refresh before each search, so anything
-    you look at is current within seconds.
-Incremental = each entry is keyed by (size, mtime); only changed/new files are
-re-read, and entries whose files vanished are dropped. The index mirrors the
-local backup dir (DATA_DIR), which is additive, so nothing is lost.
+"""Metadata search over the session catalog.
+
+Matches a query against session id / cwd / summary / project name with one
+query on the `sessions` table of ~/.clicodelog/catalog.db (catalog.py). That
+table is kept current per file — an upsert for each changed session, a
+delete for each vanished one — so nothing is loaded at startup and a refresh
+costs only the sessions that changed.
+
+Freshness is stale-while-revalidate: a search always answers from the index
+as it is, and if the last full refresh of that source is older than
+_REFRESH_TTL one background refresh (shared by all concurrent searches)
+re-walks DATA_DIR. Only a source that was never indexed blocks its first
+searches, which all wait on that one refresh. After a sync just the files
+it copied are applied (`update_paths`). `index_status` reports the
+generation (bumped whenever the index changes) and the age of the last full
+refresh. Both refresh paths also keep the full-text index (fulltext.py) in
+step with the same files.
+
+Earlier versions kept this index in ~/.clicodelog/search_index.json and
+rewrote the whole file on every refresh; it is removed on the first refresh.
 """
 
-import json
+import os
+import threading
 import time
-from pathlib import Path
 
+from . import fulltext
+from .catalog import _db, _lock, _locate, file_stats, has_sessions, refresh_catalog
 from .config import APP_DATA_DIR, DATA_DIR, SOURCES
-from .utils import encode_path_id, get_codex_cwd, get_gemini_project_hash
 
-INDEX_FILE = APP_DATA_DIR / "search_index.json"
-_REFRESH_TTL = 5.0  # seconds; min gap between lazy refreshes per source
+LEGACY_INDEX_FILE = APP_DATA_DIR / "search_index.json"
+_REFRESH_TTL = 5.0  # seconds; a search older than this schedules a refresh
 
-# In-memory index: { source_id: { file_path: entry } }
-_index: dict = {}
-_last_refresh: dict = {}
-_loaded = False
+_generation: dict = {}  # source -> count of changes applied this process
+_refreshed_at: dict = {}  # source -> time.monotonic() of the last full refresh
+_inflight: dict = {}  # source -> threading.Event set when its running refresh ends
+_state_lock = threading.Lock()
 
 
-def _read_claude_cwd(path: Path) -> str | None:
-    try:
-        with open(path, "r", errors="ignore") as fh:
-            for _ in range(20):
-                line = fh.readline()
-                if not line:
-                    break
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if entry.get("cwd"):
-                    return entry["cwd"]
-    except Exception:
-        pass
-    return None
-
-
-def _load() -> None:
-    global _index, _loaded
-    if _loaded:
-        return
-    try:
-        _index = json.loads(INDEX_FILE.read_text())
-    except Exception:
-        _index = {}
-    _loaded = True
-
-
-def _save() -> None:
-    try:
-        APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
-        INDEX_FILE.write_text(json.dumps(_index))
-    except Exception:
-        pass
-
-
-def _session_files(source_id: str, data_dir: Path):
-    if source_id == "claude-code":
-        for project_dir in data_dir.iterdir():
-            if project_dir.is_dir():
-                for f in project_dir.rglob("*.jsonl"):
-                    yield f, project_dir
-    elif source_id == "codex":
-        for f in data_dir.rglob("*.jsonl"):
-            yield f, None
-    else:  # gemini
-        for f in data_dir.rglob("chats/session-*.json"):
-            yield f, None
-
-
-def _build_entry(source_id: str, f: Path, project_dir, stat) -> dict | None:
-    # Lazy import avoids a circular import at module load (sessions imports nothing
-    # from here, but keep it tidy).
-    from .sessions import _parse_session_info
-
-    info = _parse_session_info(f, source_id)
-    if info is None:
-        return None
-
-    if source_id == "claude-code":
-        project_id = project_dir.name
-        project_name = project_dir.name.replace("-", "/").lstrip("/")
-        cwd = _read_claude_cwd(f) or ""
-    elif source_id == "codex":
-        cwd = get_codex_cwd(f) or ""
-        if not cwd:
-            return None
-        project_id = encode_path_id(cwd)
-        project_name = cwd
-    else:  # gemini
-        ph = get_gemini_project_hash(f)
-        if not ph:
-            return None
-        project_id = ph
-        project_name = f"Project {ph[:8]}..."
-        cwd = ""
-
-    return {
-        "session_id": info["id"],
-        "project_id": project_id,
-        "project_name": project_name,
-        "cwd": cwd,
-        "summary": info["summary"],
-        "first_ts": info["first_timestamp"],
-        "last_ts": info["last_timestamp"],
-        "msg_count": info["message_count"],
-        "size": stat.st_size,
-        "mtime": stat.st_mtime,
-    }
+def _bump(source_id: str, full: bool) -> None:
+    with _state_lock:
+        _generation[source_id] = _generation.get(source_id, 0) + 1
+        if full:
+            _refreshed_at[source_id] = time.monotonic()
 
 
 def refresh_index(source_id: str | None = None) -> None:
-    """Incrementally rebuild the index for one source (or all). Cheap: only
-    re-reads files whose (size, mtime) changed; drops entries for files gone."""
-    _load()
+    """Re-walk DATA_DIR for one source (or all): the catalog, then the
+    full-text index. Cheap: only files whose (size, mtime) changed are
+    re-read; entries for files gone are dropped."""
+    LEGACY_INDEX_FILE.unlink(missing_ok=True)
     sources = [source_id] if source_id else list(SOURCES.keys())
     for sid in sources:
         if sid not in SOURCES:
             continue
-        data_dir = DATA_DIR / SOURCES[sid]["data_subdir"]
-        if not data_dir.exists():
+        refresh_catalog(sid)
+        fulltext.sync_files(sid, file_stats(sid))
+        _bump(sid, full=True)
+
+
+def update_paths(source_id: str, paths) -> None:
+    """Apply a change set from sync (files added/updated under DATA_DIR) to
+    the full-text index without re-walking the tree; full refresh if the
+    source was never refreshed in this process. The catalog applies the same
+    change set itself (catalog.update_paths)."""
+    if source_id not in SOURCES:
+        return
+    with _state_lock:
+        refreshed = source_id in _refreshed_at
+    if not refreshed:
+        refresh_index(source_id)
+        return
+    data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
+    touched: dict = {}
+    for path in paths:
+        if _locate(source_id, data_dir, path) is None:
             continue
-        old = _index.get(sid, {})
-        new: dict = {}
-        for f, project_dir in _session_files(sid, data_dir):
-            key = str(f)
-            try:
-                st = f.stat()
-            except OSError:
-                continue
-            prev = old.get(key)
-            if prev and prev.get("size") == st.st_size and prev.get("mtime") == st.st_mtime:
-                new[key] = prev  # unchanged — reuse
-                continue
-            entry = _build_entry(sid, f, project_dir, st)
-            if entry:
-                new[key] = entry
-        _index[sid] = new
-        _last_refresh[sid] = time.monotonic()
-    _save()
-
-
-def _ensure_fresh(source_id: str) -> None:
-    _load()
-    last = _last_refresh.get(source_id, 0)
-    if time.monotonic() - last > _REFRESH_TTL:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        touched[path] = (st.st_size, st.st_mtime)
+    if touched:
+        fulltext.update_files(source_id, touched)
+        _bump(source_id, full=False)
+
+
+def _refresh(source_id: str, done: threading.Event) -> None:
+    try:
         refresh_index(source_id)
+    finally:
+        with _state_lock:
+            _inflight.pop(source_id, None)
+        done.set()
+
+
+def _background_refresh(source_id: str, done: threading.Event) -> None:
+    try:
+        _refresh(source_id, done)
+    except Exception as e:
+        print(f"(search index refresh skipped: {e})")
+
+
+def revalidate(source_id: str) -> None:
+    """Make sure searches of `source_id` can be answered now and schedule a
+    refresh if the index is stale. Returns at once unless the source has
+    never been indexed at all; concurrent callers share one refresh (a cold
+    source's first callers all wait for it)."""
+    with _state_lock:
+        last = _refreshed_at.get(source_id)
+        if last is not None and time.monotonic() - last <= _REFRESH_TTL:
+            return
+        cold = last is None and not has_sessions(source_id)
+        done = _inflight.get(source_id)
+        owner = done is None
+        if owner:
+            done = _inflight[source_id] = threading.Event()
+    if not cold:
+        if owner:
+            threading.Thread(target=_background_refresh, args=(source_id, done), daemon=True).start()
+        return
+    if owner:
+        _refresh(source_id, done)  # nothing to serve stale
+    else:
+        done.wait()
+
+
+def index_status(source_id: str) -> dict:
+    """{generation, age (seconds since the last full refresh, or None),
+    refreshing} for a source."""
+    with _state_lock:
+        last = _refreshed_at.get(source_id)
+        return {
+            "generation": _generation.get(source_id, 0),
+            "age": None if last is None else time.monotonic() - last,
+            "refreshing": source_id in _inflight,
+        }
+
+
+_SEARCH = """
+SELECT project_id, session_id, project_name, cwd, summary,
+       py_lower(session_id) = :q AS exact
+FROM sessions
+WHERE source = :source AND parsed = 1 AND project_id IS NOT NULL
+  AND instr(py_lower(session_id || ' ' || coalesce(cwd, '') || ' '
+                     || coalesce(summary, '') || ' ' || coalesce(project_name, '')), :q) > 0
+ORDER BY exact DESC, mtime DESC
+"""
 
 
 def search_index(query: str, source_id: str) -> list:
     """Match query against session id, cwd, summary, project name. Instant —
-    no file reads. Exact id matches are returned first."""
+    no file reads, never waits for a refresh (`revalidate`). Exact id matches
+    are returned first, then newest first."""
     q = (query or "").strip().lower()
     if not q:
         return []
-    _ensure_fresh(source_id)
-    entries = _index.get(source_id, {})
-    exact, partial = [], []
-    for e in entries.values():
-        sid = e.get("session_id", "")
-        if sid.lower() == q:
-            exact.append(e)
-            continue
-        hay = " ".join([
-            sid,
-            e.get("cwd", ""),
-            e.get("summary", ""),
-            e.get("project_name", ""),
-        ]).lower()
-        if q in hay:
-            partial.append(e)
+    revalidate(source_id)
+    with _lock:
+        rows = _db().execute(_SEARCH, {"q": q, "source": source_id}).fetchall()
     out = []
     seen = set()
-    for e in exact + partial:
-        k = (e["project_id"], e["session_id"])
+    for r in rows:
+        k = (r["project_id"], r["session_id"])
         if k in seen:
             continue
         seen.add(k)
         out.append({
-            "project_id": e["project_id"],
-            "session_id": e["session_id"],
-            "project_name": e["project_name"],
-            "cwd": e.get("cwd", ""),
-            "summary": e.get("summary", ""),
+            "project_id": r["project_id"],
+            "session_id": r["session_id"],
+            "project_name": r["project_name"],
+            "cwd": r["cwd"] or "",
+            "summary": r["summary"] or "",
         })
     return out
@@ -4,10 +4,11 @@ import subprocess
 import threading
 import time
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
 
 import uvicorn
 
-from .config import DATA_DIR, SOURCES, SYNC_INTERVAL
+from .config import DATA_DIR, RECONCILE_INTERVAL, SOURCES, SYNC_INTERVAL
 from .sync import background_sync, sync_data
 
 BANNER = r"""
@@ -54,6 +55,8 @@ def run_server(
     skip_sync: bool = False,
     debug: bool = False,
     folder: str | None = None,
+    watch: bool = False,
+    sync_workers: int | None = None,
 ) -> None:
     from .app import app  # local import avoids circular dependency at module level
     from . import sync as _sync
@@ -70,25 +73,44 @@ def run_server(
         print(f"\n❌ Could not free port {port}. Try: lsof -ti:{port} | xargs kill -9")
         return
 
+    if sync_workers:
+        _sync.sync_workers = max(1, sync_workers)
+
     if not skip_sync:
-        print("\nSyncing data from all sources...")
+        print(f"\nSyncing data from all sources ({_sync.sync_workers} workers per source)...")
+        # Sources have independent locks, so they sync side by side.
+        with ThreadPoolExecutor(max_workers=len(SOURCES)) as pool:
+            results = dict(zip(SOURCES, pool.map(lambda sid: sync_data(source_id=sid), SOURCES)))
         for source_id, config in SOURCES.items():
             print(f"\n{config['name']}:")
             print(f"  Source: {config['source_dir']}")
             print(f"  Backup: {DATA_DIR / config['data_subdir']}")
-            if sync_data(source_id=source_id):
+            if results[source_id]:
                 print("  ✓ Sync completed!")
             else:
                 print("  ⚠ Could not sync — using existing local data if available.")
     else:
         print("\nSkipping initial sync (--no-sync)")
 
-    print(f"\nBackground sync: every {SYNC_INTERVAL // 3600} hour(s)")
-    threading.Thread(target=background_sync, daemon=True).start()
+    interval = SYNC_INTERVAL
+    if watch:
+        from .watcher import start_watcher
+        backend = start_watcher()
+        if backend:
+            interval = RECONCILE_INTERVAL
+            _sync.watch_backend = backend
+            print(f"\nWatching sources for changes ({backend}); full reconcile every {interval // 3600} hour(s)")
+        else:
+            print("\n⚠ No file watcher available (install 'watchdog' or run on Linux) — polling instead.")
+    if interval == SYNC_INTERVAL:
+        print(f"\nBackground sync: every {SYNC_INTERVAL // 3600} hour(s)")
+    _sync.sync_interval = interval
+    threading.Thread(target=background_sync, args=(interval,), daemon=True).start()
     print("Background sync thread started.")
 
-    # Build/refresh the search index in the background so the first search is
-    # instant. Incremental — only changed files are re-read on later runs.
+    # Build/refresh the session catalog and search index in the background so
+    # the first project list and search are instant. Incremental — only changed
+    # files are re-read on later runs. refresh_index walks the catalog first.
     def _build_index():
         try:
             from .search_index import refresh_index
@@ -1,56 +1,44 @@
 import json
+import posixpath
+import re
+from array import array
 from datetime import datetime
 from pathlib import Path
 
-from .config import DATA_DIR, SOURCES
-from .utils import decode_path_id, get_codex_cwd, get_gemini_project_hash
+from .catalog import list_sessions
+from .config import SOURCES
+from .jsonlib import dumps, loads
+from .parsers import codex, gemini
+from .utils import decode_path_id, encode_path_id
 
 
 def get_sessions(project_id: str, source_id: str) -> list:
     if source_id not in SOURCES:
         return []
 
-    data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
-
-    if source_id == "claude-code":
-        project_dir = data_dir / project_id
-        if not project_dir.exists():
-            return []
-        files = sorted(project_dir.glob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True)
-
-    elif source_id == "codex":
+    if source_id == "codex":
+        # Normalise the id so differently padded encodings of a cwd still match.
         try:
-            target_cwd = decode_path_id(project_id)
+            project_id = encode_path_id(decode_path_id(project_id))
         except Exception:
             return []
-        files = sorted(
-            [f for f in data_dir.rglob("*.jsonl") if get_codex_cwd(f) == target_cwd],
-            key=lambda x: x.stat().st_mtime, reverse=True,
-        )
 
-    else:  # gemini
-        files = sorted(
-            [f for f in data_dir.rglob("chats/session-*.json") if get_gemini_project_hash(f) == project_id],
-            key=lambda x: x.stat().st_mtime, reverse=True,
-        )
-
-    return [info for f in files if (info := _parse_session_info(f, source_id)) is not None]
+    return list_sessions(source_id, project_id)
 
 
 def get_subagent_sessions(project_id: str, session_id: str, source_id: str) -> list:
     if source_id != "claude-code":
         return []
-    data_dir = DATA_DIR / SOURCES[source_id]["data_subdir"]
-    sub_dir = data_dir / project_id / session_id
-    if not sub_dir.exists():
-        return []
-    files = sorted(sub_dir.rglob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True)
-    return [info for f in files if (info := _parse_session_info(f, source_id)) is not None]
+    return list_sessions(source_id, project_id, parent_id=session_id)
 
 
-def _parse_session_info(session_file: Path, source_id: str):
-    state = {"first_summary": None, "message_count": 0,
-             "first_timestamp": None, "last_timestamp": None, "first_user_message": None}
+def _read_session_state(session_file: Path, source_id: str):
+    """Summary fields of one session file, or None if it can't be read."""
+    state = {"first_summary": None, "message_count": 0, "cwd": None,
+             "first_timestamp": None, "last_timestamp": None, "first_user_message": None,
+             "usage": {}, "usage_seen": set(), "model": None, "token_total": None,
+             "tools": [], "tool_pending": {}, "touches": [], "codex_parse": codex.new_state(),
+             "codex_messages": 0}
     try:
         if source_id == "gemini":
             _read_gemini_file(session_file, state)
@@ -59,44 +47,162 @@ def _parse_session_info(session_file: Path, source_id: str):
     except Exception as e:
         print(f"Error reading {session_file}: {e}")
         return None
+    return state
+
+
+# --- Token usage --------------------------------------------------------------
+# state["usage"] maps (day, model) to an array of USAGE_FIELDS counters; the
+# catalog stores one row per key (catalog.py `usage` table).
+USAGE_FIELDS = ("input", "output", "cache_read", "cache_write", "requests")
+
+
+def _count(value) -> int:
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else 0
+
+
+def _add_usage(state: dict, timestamp, model, input_tokens, output_tokens, cache_read, cache_write) -> None:
+    day = timestamp[:10] if isinstance(timestamp, str) and len(timestamp) >= 10 else ""
+    key = (day, model or "unknown")
+    counters = state["usage"].get(key)
+    if counters is None:
+        counters = state["usage"][key] = array("q", bytes(8 * len(USAGE_FIELDS)))
+    counters[0] += _count(input_tokens)
+    counters[1] += _count(output_tokens)
+    counters[2] += _count(cache_read)
+    counters[3] += _count(cache_write)
+    counters[4] += 1
+
+
+def _gemini_tokens(tokens: dict) -> tuple:
+    """(input, output, cache_read, cache_write) of a Gemini `tokens` record,
+    split like Claude's usage: Gemini's `input` includes the cached prompt
+    tokens, and thoughts bill as output. Also used by the dataset export."""
+    cached = _count(tokens.get("cached"))
+    return (_count(tokens.get("input")) - cached,
+            _count(tokens.get("output")) + _count(tokens.get("thoughts")), cached, 0)
+
+
+# --- Tool calls -------------------------------------------------------------------
+# state["tools"] holds one list per invocation, in TOOL_FIELDS order; the
+# result, matched by call id, fills in output size, duration and error.
+# state["touches"] holds a (file path, message index, tool name, timestamp)
+# for every file a call names; the index is that of the parsed conversation
+# message carrying the call (parsers/), so a hit links straight to it.
+TOOL_FIELDS = ("name", "timestamp", "input_size", "output_size", "duration_ms", "file_path", "error")
+_PATH_ARGS = ("file_path", "path", "notebook_path", "filePath", "absolute_path", "file")
+_PATH_LIST_ARGS = ("paths", "file_paths")  # e.g. Gemini read_many_files
+_PATCH_TARGET = re.compile(r"^\*\*\* (?:(?:Add|Update|Delete) File|Move to): (.+?)\s*$", re.M)
+
+
+def _size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "replace"))
+    try:
+        return len(dumps(value))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def _patch_targets(value) -> list:
+    """Files named by a Codex apply_patch envelope in a string (or in any
+    string of a command list)."""
+    texts = value if isinstance(value, list) else [value]
+    return [m for text in texts if isinstance(text, str) and "*** Begin Patch" in text
+            for m in _PATCH_TARGET.findall(text)]
+
+
+def _touched_paths(args) -> list:
+    """File paths a tool call names: path-like arguments, path lists, and the
+    targets of a Codex apply_patch (raw input, or inside a shell command)."""
+    if isinstance(args, str):
+        try:
+            args = loads(args)  # codex passes arguments as a JSON string
+        except ValueError:
+            return _patch_targets(args)
+    if isinstance(args, str):
+        return _patch_targets(args)
+    if not isinstance(args, dict):
+        return []
+    paths = [args[key] for key in _PATH_ARGS if isinstance(args.get(key), str) and args[key]]
+    for key in _PATH_LIST_ARGS:
+        if isinstance(args.get(key), list):
+            paths.extend(p for p in args[key] if isinstance(p, str) and p)
+    paths.extend(_patch_targets(args.get("input")))
+    paths.extend(_patch_targets(args.get("command")))
+    return list(dict.fromkeys(paths))
+
+
+def _resolve(path: str, cwd) -> str:
+    """Absolute, normalised form of a path relative to the session's cwd
+    (left as given when there is no cwd to resolve it against)."""
+    if not posixpath.isabs(path):
+        if not (cwd and posixpath.isabs(cwd)):
+            return path
+        path = posixpath.join(cwd, path)
+    return "/" + posixpath.normpath(path).lstrip("/")  # normpath keeps a leading "//"
+
+
+def _ms_between(start, end):
+    try:
+        a = datetime.fromisoformat(start.replace("Z", "+00:00"))
+        b = datetime.fromisoformat(end.replace("Z", "+00:00"))
+        return max(0, int((b - a).total_seconds() * 1000))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _tool_call(state: dict, call_id, name, timestamp, args, msg_index: int, cwd=None) -> None:
+    if call_id and call_id in state["tool_pending"]:
+        return  # already seen (repeated log entry)
+    paths = [_resolve(p, cwd) for p in _touched_paths(args)]
+    call = [name or "", timestamp, _size(args), None, None, paths[0] if paths else None, 0]
+    state["tools"].append(call)
+    if call_id:
+        state["tool_pending"][call_id] = call
+    for path in paths:
+        state["touches"].append((path, msg_index, name or "", timestamp))
 
-    sub_dir = session_file.parent / session_file.stem
-    subagent_count = len(list(sub_dir.rglob("*.jsonl"))) if sub_dir.exists() else 0
 
-    return {
-        "id": session_file.stem,
-        "filename": session_file.name,
-        "summary": state["first_summary"] or state["first_user_message"] or "No summary",
-        "message_count": state["message_count"],
-        "first_timestamp": state["first_timestamp"],
-        "last_timestamp": state["last_timestamp"],
-        "size": session_file.stat().st_size,
-        "modified": datetime.fromtimestamp(session_file.stat().st_mtime).isoformat(),
-        "full_path": str(session_file),
-        "subagent_count": subagent_count,
-    }
+def _tool_result(state: dict, call_id, timestamp, output, error: bool = False) -> None:
+    call = state["tool_pending"].get(call_id)
+    if call is None or call[3] is not None:
+        return
+    call[3] = _size(output)
+    call[4] = _ms_between(call[1], timestamp)
+    call[6] = 1 if error else 0
 
 
 def _read_gemini_file(session_file: Path, state: dict) -> None:
-    with open(session_file, "r") as f:
-        data = json.load(f)
-    state["first_timestamp"] = data.get("startTime")
-    state["last_timestamp"] = data.get("lastUpdated")
-    for msg in data.get("messages", []):
+    meta: dict = {}
+    for msg in gemini.iter_raw_messages(session_file, meta):
         msg_type = msg.get("type")
+        tokens = msg.get("tokens")
+        if msg_type == "gemini" and isinstance(tokens, dict):
+            _add_usage(state, msg.get("timestamp"), msg.get("model"), *_gemini_tokens(tokens))
+        if msg_type == "gemini":
+            for tc in msg.get("toolCalls") or []:
+                if isinstance(tc, dict):
+                    _tool_call(state, tc.get("id"), tc.get("name"), tc.get("timestamp") or msg.get("timestamp"),
+                               tc.get("args"), state["message_count"])
+                    if "result" in tc:
+                        _tool_result(state, tc.get("id"), None, tc.get("result"), tc.get("status") == "error")
         if msg_type in ("user", "gemini"):
             state["message_count"] += 1
             if msg_type == "user" and not state["first_user_message"]:
                 content = msg.get("content", "")
                 if isinstance(content, str) and len(content) < 500:
                     state["first_user_message"] = content[:100]
+    state["first_timestamp"] = meta.get("startTime")
+    state["last_timestamp"] = meta.get("lastUpdated")
 
 
 def _read_jsonl_file(session_file: Path, source_id: str, state: dict) -> None:
     with open(session_file, "r") as f:
         for line in f:
             try:
-                entry = json.loads(line)
+                entry = loads(line)
                 if source_id == "claude-code":
                     _read_claude_entry(entry, state)
                 else:
@@ -106,12 +212,36 @@ def _read_jsonl_file(session_file: Path, source_id: str, state: dict) -> None:
 
 
 def _read_claude_entry(entry: dict, state: dict) -> None:
+    if entry.get("cwd") and not state["cwd"]:
+        state["cwd"] = entry["cwd"]
     if entry.get("type") == "summary" and not state["first_summary"]:
         state["first_summary"] = entry.get("summary", "")
     if entry.get("timestamp"):
         if not state["first_timestamp"]:
             state["first_timestamp"] = entry["timestamp"]
         state["last_timestamp"] = entry["timestamp"]
+    if entry.get("type") == "assistant":
+        msg = entry.get("message") or {}
+        usage = msg.get("usage")
+        # One API response is logged as several entries (one per content
+        # block) that repeat its usage; count it once.
+        response_id = msg.get("id") or entry.get("uuid")
+        if isinstance(usage, dict) and response_id not in state["usage_seen"]:
+            state["usage_seen"].add(response_id)
+            _add_usage(state, entry.get("timestamp"), msg.get("model"),
+                       usage.get("input_tokens"), usage.get("output_tokens"),
+                       usage.get("cache_read_input_tokens"), usage.get("cache_creation_input_tokens"))
+    content = (entry.get("message") or {}).get("content")
+    if entry.get("type") in ("user", "assistant") and isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "tool_use":
+                _tool_call(state, block.get("id"), block.get("name"), entry.get("timestamp"), block.get("input"),
+                           state["message_count"], entry.get("cwd") or state["cwd"])
+            elif block.get("type") == "tool_result":
+                _tool_result(state, block.get("tool_use_id"), entry.get("timestamp"), block.get("content"),
+                             bool(block.get("is_error")))
     if entry.get("type") in ("user", "assistant"):
         state["message_count"] += 1
         if entry.get("type") == "user" and not state["first_user_message"]:
@@ -131,8 +261,21 @@ def _read_codex_entry(entry: dict, state: dict) -> None:
         if not state["first_timestamp"]:
             state["first_timestamp"] = ts
         state["last_timestamp"] = ts
-    if entry.get("type") == "response_item":
+    # Count messages the way the parser does (it merges tool-only entries
+    # into the previous message) so tool calls get the viewer's message index.
+    if codex.feed_entry(entry, state["codex_parse"]) is not None:
+        state["codex_messages"] += 1
+    if entry.get("type") == "session_meta":
+        state["cwd"] = (entry.get("payload") or {}).get("cwd") or state["cwd"]
+    elif entry.get("type") == "response_item":
         payload = entry.get("payload", {})
+        payload_type = payload.get("type")
+        if payload_type in ("function_call", "custom_tool_call"):
+            args = payload.get("arguments") if payload_type == "function_call" else payload.get("input")
+            _tool_call(state, payload.get("call_id"), payload.get("name"), ts, args,
+                       max(state["codex_messages"] - 1, 0), state["cwd"])
+        elif payload_type in ("function_call_output", "custom_tool_call_output"):
+            _tool_result(state, payload.get("call_id"), ts, payload.get("output"))
         role = payload.get("role")
         if role in ("user", "assistant"):
             state["message_count"] += 1
@@ -143,7 +286,37 @@ def _read_codex_entry(entry: dict, state: dict) -> None:
                         if not text.startswith("<") and len(text) < 500:
                             state["first_user_message"] = text[:100]
                             break
+    elif entry.get("type") == "turn_context":
+        state["model"] = entry.get("payload", {}).get("model") or state["model"]
     elif entry.get("type") == "event_msg":
         payload = entry.get("payload", {})
         if payload.get("type") == "user_message" and not state["first_user_message"]:
             state["first_user_message"] = payload.get("message", "")[:100]
+        elif payload.get("type") == "token_count":
+            _read_codex_tokens(payload.get("info") or {}, ts, state)
+
+
+def _read_codex_tokens(info: dict, timestamp, state: dict) -> None:
+    tokens = _codex_tokens(info, state)
+    if tokens is not None:
+        _add_usage(state, timestamp, state["model"], *tokens)
+
+
+def _codex_tokens(info: dict, state: dict) -> tuple | None:
+    """(input, output, cache_read, cache_write) of a Codex token_count `info`,
+    or None if it adds nothing; state["token_total"] carries the running
+    total between calls. Also used by the dataset export."""
+    # Prefer the per-turn counts; otherwise diff the running totals.
+    last = info.get("last_token_usage")
+    total = info.get("total_token_usage")
+    if isinstance(total, dict) and total == state["token_total"]:
+        return None  # the same count re-sent (e.g. with a rate-limit update)
+    if not isinstance(last, dict):
+        if not isinstance(total, dict):
+            return None
+        prev = state["token_total"] or {}
+        last = {k: _count(total.get(k)) - _count(prev.get(k)) for k in total}
+    if isinstance(total, dict):
+        state["token_total"] = total
+    cached = _count(last.get("cached_input_tokens"))
+    return _count(last.get("input_tokens")) - cached, _count(last.get("output_tokens")), cached, 0
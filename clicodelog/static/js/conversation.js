@@ -1,14 +1,15 @@
 function applyRoleFilter() {
     var mc = document.getElementById('messages-container');
     if (!mc) return;
-    var empty = activeFilters.size === 0;
-    mc.querySelectorAll('.message').forEach(function(el) {
-        if (empty) { el.style.display = ''; return; }
-        var show = (activeFilters.has('user') && el.classList.contains('user')) ||
-                   (activeFilters.has('assistant') && el.classList.contains('assistant')) ||
-                   (activeFilters.has('tools') && el.classList.contains('has-tools'));
-        el.style.display = show ? '' : 'none';
-    });
+    mc.querySelectorAll('.message').forEach(applyRoleFilterTo);
+}
+
+function applyRoleFilterTo(el) {
+    if (activeFilters.size === 0) { el.style.display = ''; return; }
+    var show = (activeFilters.has('user') && el.classList.contains('user')) ||
+               (activeFilters.has('assistant') && el.classList.contains('assistant')) ||
+               (activeFilters.has('tools') && el.classList.contains('has-tools'));
+    el.style.display = show ? '' : 'none';
 }
 
 function toggleRoleFilter(filter) {
@@ -79,14 +80,17 @@ function getChronologicalMessages() {
     if (!currentConversation) return [];
     var msgs = currentConversation.messages;
     if (dateFromFilter == null && dateToFilter == null) return msgs;
-    return msgs.filter(function(m) {
-        if (!m.timestamp) return false;
-        var t = Date.parse(m.timestamp);
-        if (isNaN(t)) return false;
-        if (dateFromFilter != null && t < dateFromFilter) return false;
-        if (dateToFilter != null && t > dateToFilter) return false;
-        return true;
-    });
+    return msgs.filter(inDateRange);
+}
+
+function inDateRange(m) {
+    if (dateFromFilter == null && dateToFilter == null) return true;
+    if (!m.timestamp) return false;
+    var t = Date.parse(m.timestamp);
+    if (isNaN(t)) return false;
+    if (dateFromFilter != null && t < dateFromFilter) return false;
+    if (dateToFilter != null && t > dateToFilter) return false;
+    return true;
 }
 
 // Display order — what the conversation pane renders. Honors the newest/oldest
@@ -479,11 +483,79 @@ function setupLazyObserver(messagesDiv) {
     lazyObserver.observe(sentinel);
 }
 
+// --- Live tail (live.js): new messages patch the rendered window in place,
+// --- so the lazy window and the reader's scroll position are kept.
+
+// Drop the chronologically last message (the live tail is replacing it).
+function liveDropLast() {
+    var old = currentConversation.messages.pop();
+    var mc = document.getElementById('messages-container');
+    if (!mc || !old || !inDateRange(old)) return;
+    // Its display slot: the top when newest first, else the end of the
+    // list, which is rendered only once the lazy window reached it.
+    var shown = getChronologicalMessages().length + 1;
+    var i = msgOrder === 'newest' ? 0 : shown - 1;
+    if (i < lazyOffset && mc.children[i]) {
+        mc.removeChild(mc.children[i]);
+        lazyOffset--;
+    }
+}
+
+// Add messages at the chronological end. They are rendered only where the
+// lazy window already reaches; the view follows them only when the reader
+// is pinned to the bottom.
+function liveAppendMessages(msgs) {
+    var conv = currentConversation;
+    msgs.forEach(function(m) { conv.messages.push(m); });
+    var mc = document.getElementById('messages-container');
+    if (!mc) return;
+    var fresh = msgs.filter(inDateRange);
+    var total = getChronologicalMessages().length;
+    var scrollEl = getScrollEl();
+    var pinned = scrollEl.scrollHeight - scrollEl.scrollTop - scrollEl.clientHeight < 40;
+    if (msgOrder === 'newest') {
+        fresh.forEach(function(m, k) {
+            var el = buildMessageEl(m, fresh.length - 1 - k);
+            applyRoleFilterTo(el);
+            mc.insertBefore(el, mc.firstChild);
+        });
+        lazyOffset += fresh.length;
+    } else if (lazyOffset === total - fresh.length) {
+        fresh.forEach(function(m) {
+            var el = buildMessageEl(m, lazyOffset);
+            applyRoleFilterTo(el);
+            mc.appendChild(el);
+            lazyOffset++;
+        });
+        if (pinned && fresh.length) {
+            requestAnimationFrame(function() { scrollEl.scrollTop = scrollEl.scrollHeight; });
+        }
+    }
+    var sentinel = document.getElementById('lazy-sentinel');
+    var remaining = total - lazyOffset;
+    if (sentinel) {
+        sentinel.style.display = remaining > 0 ? '' : 'none';
+        sentinel.textContent = remaining > 0 ? (remaining + ' more\u2026') : '';
+    }
+    if (remaining > 0 && !lazyObserver) setupLazyObserver(mc);
+    updateFilterStatus();
+}
+
+// Empty user protocol messages (tool-result acknowledgments with no content)
+function isProtocolMessage(m) {
+    return m.role === 'user' && !m.content && !(m.tool_uses && m.tool_uses.length > 0);
+}
+
 function renderConversation(conv) {
-    // Strip empty user protocol messages (tool-result acknowledgments with no content)
-    conv.messages = conv.messages.filter(function(m) {
-        return !(m.role === 'user' && !m.content && !(m.tool_uses && m.tool_uses.length > 0));
-    });
+    // Messages as sent by the server, before filtering (the live tail resumes
+    // from here), and where the last of them sits after filtering (-1: dropped)
+    if (conv.raw_count == null) {
+        var rawLast = conv.messages[conv.messages.length - 1];
+        conv.raw_count = conv.messages.length;
+        conv.raw_last = rawLast && !isProtocolMessage(rawLast) ? null : -1;
+    }
+    conv.messages = conv.messages.filter(function(m) { return !isProtocolMessage(m); });
+    if (conv.raw_last == null) conv.raw_last = conv.messages.length - 1;
     currentConversation = conv;
     lazyOffset = 0;
     if (typeof refreshBookmarkSet === 'function') refreshBookmarkSet();
@@ -526,6 +598,7 @@ function renderConversation(conv) {
     var metaRow = document.createElement('div');
     metaRow.className = 'conversation-meta';
     var countSpan = document.createElement('span');
+    countSpan.id = 'conv-message-count';
     countSpan.textContent = conv.messages.length + ' messages';
     metaRow.appendChild(countSpan);
     if (totalTokens > 0) {
@@ -0,0 +1,45 @@
+// Live tail: while a conversation is open, follow its session file over SSE
+// and append new messages as the agent writes them.
+var liveSource = null;
+
+function stopLiveTail() {
+    if (liveSource) { liveSource.close(); liveSource = null; }
+}
+
+function startLiveTail(projectId, sessionId, conv) {
+    stopLiveTail();
+    var url = '/api/projects/' + projectId + '/sessions/' + sessionId + '/stream?source=' + currentSource +
+        '&after=' + (conv.raw_count || 0);
+    var es = new EventSource(url);
+    liveSource = es;
+
+    es.addEventListener('messages', function(e) {
+        if (liveSource !== es || currentConversation !== conv) { es.close(); return; }
+        var data = JSON.parse(e.data);
+        var incoming = data.messages;
+        // A start below what we have re-sends our last raw message (it grew):
+        // the visible message it became (the last one, unless it was filtered
+        // out) is dropped, and the re-sent version is handled like a new one.
+        if (data.start < conv.raw_count && incoming.length && conv.raw_last >= 0) {
+            liveDropLast();
+            conv.raw_last = -1;
+        }
+        var added = incoming.filter(function(m) { return !isProtocolMessage(m); });
+        liveAppendMessages(added);
+        if (incoming.length) {
+            conv.raw_last = isProtocolMessage(incoming[incoming.length - 1]) ? -1 : conv.messages.length - 1;
+        }
+        conv.raw_count = data.total;
+        var count = document.getElementById('conv-message-count');
+        if (count) count.textContent = conv.messages.length + ' messages';
+    });
+
+    es.addEventListener('reset', function() {
+        es.close();
+        if (liveSource !== es) return;
+        liveSource = null;
+        delete conversationCache[projectId + ':' + sessionId];
+        if (typeof selectSession !== 'function') window.location.reload();
+        else if (currentSessionId === sessionId) selectSession(sessionId);
+    });
+}
@@ -116,8 +116,10 @@ async function selectSession(sessionId) {
     currentSessionId = sessionId;
     applySessionFilters();
     var cacheKey = currentProjectId + ':' + sessionId;
+    if (typeof stopLiveTail === 'function') stopLiveTail();
     if (conversationCache[cacheKey]) {
         renderConversation(conversationCache[cacheKey]);
+        if (typeof startLiveTail === 'function') startLiveTail(currentProjectId, sessionId, conversationCache[cacheKey]);
         return;
     }
     setPanel('conversation-content', loadingSpinner('Loading conversation...'));
@@ -125,5 +127,6 @@ async function selectSession(sessionId) {
         var conv = await fetch('/api/projects/' + currentProjectId + '/sessions/' + sessionId + '?source=' + currentSource).then(function(r) { return r.json(); });
         conversationCache[cacheKey] = conv;
         renderConversation(conv);
+        if (typeof startLiveTail === 'function' && !conv.error) startLiveTail(currentProjectId, sessionId, conv);
     } catch (e) { setPanel('conversation-content', emptyState('', 'Error loading conversation')); }
 }
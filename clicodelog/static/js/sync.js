@@ -18,6 +18,36 @@ function updateSyncStatus(lastSync) {
     }
 }
 
+function syncProgressText(job) {
+    var p = job.progress || {};
+    if (job.phase === 'indexing') return 'Indexing… ' + (p.files_reindexed || 0) + ' files';
+    var text = 'Syncing… ' + (p.files_scanned || 0) + ' files';
+    if (p.files_copied) text += ', ' + p.files_copied + ' copied (' + formatSize(p.bytes_copied || 0) + ')';
+    if (job.eta_seconds != null) text += ', ~' + Math.ceil(job.eta_seconds) + 's left';
+    return text;
+}
+
+// Sync runs as a server-side job; follow its progress over SSE.
+function watchSyncJob(jobId) {
+    return new Promise(function(resolve) {
+        var es = new EventSource('/api/sync/jobs/' + jobId + '/events');
+        var last = null;
+        es.onmessage = function(e) {
+            last = JSON.parse(e.data);
+            if (last.status === 'success' || last.status === 'error') {
+                es.close();
+                resolve(last);
+            } else {
+                document.getElementById('sync-status').textContent = syncProgressText(last);
+            }
+        };
+        es.onerror = function() {
+            es.close();
+            resolve(last && (last.status === 'success' || last.status === 'error') ? last : { status: 'error' });
+        };
+    });
+}
+
 async function manualSync() {
     const btn = document.getElementById('sync-btn');
     btn.classList.add('syncing');
@@ -25,8 +55,9 @@ async function manualSync() {
     document.getElementById('sync-status').textContent = 'Syncing...';
     try {
         const data = await fetch('/api/sync?source=' + currentSource, { method: 'POST' }).then(r => r.json());
-        if (data.status === 'success') {
-            updateSyncStatus(data.last_sync);
+        const job = data.job ? await watchSyncJob(data.job.id) : { status: 'error' };
+        if (job.status === 'success') {
+            updateSyncStatus(job.last_sync);
             conversationCache = {};
             if (typeof loadProjects === 'function') await loadProjects();
         } else {
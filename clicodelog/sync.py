@@ -1,14 +1,15 @@
 import ctypes
 import ctypes.util
+import os
 import shutil
 import sys
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
-from .config import DATA_DIR, SOURCES, SYNC_INTERVAL
-from .utils import get_codex_cwd, get_gemini_project_hash
+from .config import DATA_DIR, SOURCES, SYNC_INTERVAL, SYNC_WORKERS
 
 
 # --- APFS clonefile support ---------------------------------------------------
@@ -27,39 +28,182 @@ if sys.platform == "darwin":
         _clonefile = None
 
 
-def _clone_or_copy(src: Path, dest: Path) -> None:
-    """Clone src → dest (APFS COW) if possible, else fall back to copy2."""
+# --- Linux reflink / in-kernel copy -------------------------------------------
+# The Linux counterpart: the FICLONE ioctl makes a copy-on-write reflink on
+# btrfs / XFS (reflink=1) / bcachefs, costing no extra disk. Where that is not
+# supported, copy_file_range (or sendfile) still copies inside the kernel —
+# server-side on NFS, no userspace buffers — before falling back to copy2.
+_FICLONE = 0x40049409  # _IOW(0x94, 9, int)
+_linux = sys.platform.startswith("linux")
+if _linux:
+    import fcntl
+
+
+def _kernel_copy(src_fd: int, dest_fd: int, size: int) -> str:
+    """Copy size bytes between fds in-kernel; returns the syscall used."""
+    for name in ("copy_file_range", "sendfile"):
+        fn = getattr(os, name, None)
+        if fn is None:
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                if name == "copy_file_range":
+                    n = fn(src_fd, dest_fd, size - copied, copied, copied)
+                else:
+                    n = fn(dest_fd, src_fd, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            return name
+        except OSError:
+            # Unsupported for this pair of filesystems — start over with the next.
+            os.ftruncate(dest_fd, 0)
+            os.lseek(dest_fd, 0, os.SEEK_SET)
+    raise OSError("no in-kernel copy available")
+
+
+def _linux_copy(src: Path, dest: Path) -> str | None:
+    """Reflink or in-kernel copy src → dest; None if neither worked."""
+    try:
+        with open(src, "rb") as fs, open(dest, "wb") as fd:
+            try:
+                fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+                strategy = "reflink"
+            except OSError:
+                strategy = _kernel_copy(fs.fileno(), fd.fileno(), os.fstat(fs.fileno()).st_size)
+        shutil.copystat(src, dest)
+    except OSError:
+        try:
+            dest.unlink()
+        except OSError:
+            pass
+        return None
+    return strategy
+
+
+def _clone_or_copy(src: Path, dest: Path) -> str:
+    """Clone src → dest (APFS COW / Linux reflink) if possible, else copy in
+    the kernel, else fall back to copy2. Returns the strategy used."""
     if _clonefile is not None:
         # clonefile fails if dest already exists, so caller guarantees it doesn't.
         rc = _clonefile(str(src).encode(), str(dest).encode(), 0)
         if rc == 0:
-            return
+            return "clonefile"
         # Any failure (cross-device, unsupported) → fall through to a real copy.
+    if _linux:
+        strategy = _linux_copy(src, dest)
+        if strategy:
+            return strategy
     shutil.copy2(src, dest)
+    return "copy"
 
 
-def _additive_copy(src: Path, dest: Path) -> None:
+# --- Tail-only sync for append-only logs -------------------------------------
+# JSONL session logs only ever grow. When the backup is a prefix of the source
+# we append just the new bytes instead of recopying the whole file. The prefix
+# is verified by comparing the last _TAIL_CHECK bytes of the backup's length in
+# both files; any mismatch falls back to a full copy.
+_TAIL_CHECK = 4096
+_APPEND_ONLY_SUFFIXES = (".jsonl",)
+
+
+def _append_tail(src: Path, dest: Path, src_size: int, dest_size: int) -> bool:
+    """Append src[dest_size:src_size] to dest if dest is a prefix of src."""
+    if not dest_size or src.suffix not in _APPEND_ONLY_SUFFIXES:
+        return False
+    check = min(_TAIL_CHECK, dest_size)
+    try:
+        with open(src, "rb") as fs, open(dest, "r+b") as fd:
+            fs.seek(dest_size - check)
+            fd.seek(dest_size - check)
+            if fs.read(check) != fd.read(check):
+                return False
+            # fd is now at dest_size; truncate guards against a concurrent
+            # writer having left dest longer than the size we stat'ed.
+            fd.truncate(dest_size)
+            remaining = src_size - dest_size
+            while remaining > 0:
+                chunk = fs.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                fd.write(chunk)
+                remaining -= len(chunk)
+        shutil.copystat(src, dest)
+    except OSError:
+        return False
+    return True
+
+
+def _additive_copy(src: Path, dest: Path, stats: dict | None = None, workers: int = 1) -> None:
     """Recursively copy src → dest, never deleting from dest.
 
     Files in dest that no longer exist in src are preserved (so deletions in
     the source — e.g. Claude Code pruning old projects — don't propagate to
     our local backup). For each source file, only copy when the destination
-    is missing or differs in size/mtime, so re-syncs are cheap. New files are
-    cloned (APFS) when possible so the backup costs almost no extra disk.
+    is missing or differs in size/mtime, so re-syncs are cheap. A log that
+    merely grew gets only its new bytes appended. New files are cloned (APFS,
+    Linux reflink) when possible so the backup costs almost no extra disk.
+
+    Directories are walked with os.scandir; with workers > 1 each directory is
+    a task on a thread pool, so stats and copies across project dirs overlap.
+
+    If given, `stats` counts files scanned, and files copied and bytes written
+    per strategy. It is updated live, so it doubles as a progress report.
     """
     if not src.exists():
         return
-    if src.is_dir():
-        dest.mkdir(parents=True, exist_ok=True)
-        for entry in src.iterdir():
-            _additive_copy(entry, dest / entry.name)
+    if not src.is_dir():
+        _copy_file(src, dest, stats)
         return
-    if dest.exists():
+    if workers <= 1:
+        todo = [(src, dest)]
+        while todo:
+            todo.extend(_copy_dir(*todo.pop(), stats))
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync") as pool:
+        pending = {pool.submit(_copy_dir, src, dest, stats)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for sub_src, sub_dest in fut.result():
+                    pending.add(pool.submit(_copy_dir, sub_src, sub_dest, stats))
+
+
+def _copy_dir(src: Path, dest: Path, stats: dict | None) -> list:
+    """Copy the files directly inside src; return its (src, dest) subdirs."""
+    dest.mkdir(parents=True, exist_ok=True)
+    subdirs = []
+    try:
+        it = os.scandir(src)
+    except OSError:
+        return subdirs
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    subdirs.append((Path(entry.path), dest / entry.name))
+                else:
+                    _copy_file(Path(entry.path), dest / entry.name, stats, entry.stat())
+            except OSError as e:
+                print(f"  (sync skipped {entry.path}: {e})")
+    return subdirs
+
+
+def _copy_file(src: Path, dest: Path, stats: dict | None, s=None) -> None:
+    _count(stats, None, 0)
+    try:
+        d = dest.stat()
+    except OSError:
+        d = None
+    if d is not None:
         try:
-            s = src.stat()
-            d = dest.stat()
+            s = s or src.stat()
             if s.st_size == d.st_size and d.st_mtime >= s.st_mtime:
                 return
+            if s.st_size > d.st_size and _append_tail(src, dest, s.st_size, d.st_size):
+                _count(stats, "append", s.st_size - d.st_size, dest)
+                return
         except OSError:
             pass
         # Content changed: replace so we can clone afresh.
@@ -67,19 +211,59 @@ def _additive_copy(src: Path, dest: Path) -> None:
             dest.unlink()
         except OSError:
             shutil.copy2(src, dest)
+            _count(stats, "copy", dest.stat().st_size, dest)
             return
-    _clone_or_copy(src, dest)
+    strategy = _clone_or_copy(src, dest)
+    _count(stats, strategy, dest.stat().st_size, dest)
 
-sync_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+
+
+def _count(stats: dict | None, strategy: str | None, nbytes: int, dest: Path | None = None) -> None:
+    """Tally one scanned file (strategy None) or one copy into stats. Copied
+    destinations are collected in stats["changed"] for the index hand-off."""
+    if stats is None:
+        return
+    with _stats_lock:
+        if strategy is None:
+            stats["scanned"] = stats.get("scanned", 0) + 1
+            return
+        stats.setdefault("changed", []).append(str(dest))
+        stats["files"] = stats.get("files", 0) + 1
+        stats["bytes"] = stats.get("bytes", 0) + nbytes
+        stats.setdefault("strategies", {})
+        stats["strategies"][strategy] = stats["strategies"].get(strategy, 0) + 1
+
+
+def _format_copy_stats(stats: dict) -> str:
+    if not stats.get("files"):
+        return "no files changed"
+    by = ", ".join(f"{n} {name}" for name, n in sorted(stats["strategies"].items()))
+    return f"{stats['files']} files / {stats['bytes']:,} bytes copied ({by})"
+
+
+# One lock per source: different sources sync concurrently, the same source never.
+sync_locks = {sid: threading.Lock() for sid in SOURCES}
+# Threads used to walk and copy one source tree (CLI: --sync-workers <n>).
+sync_workers: int = SYNC_WORKERS
 last_sync_time: dict = {}
 current_source: str = "claude-code"
 # Optional case-insensitive substring; when set, the projects API only returns
 # folders whose id/name contains it (CLI: --folder <name>). None = show all.
 folder_filter: str | None = None
+# How the backup is kept current, set by the server: the file watcher backend
+# (None = polling) and the seconds between background full syncs.
+watch_backend: str | None = None
+sync_interval: int = SYNC_INTERVAL
 
 
-def sync_data(source_id: str | None = None, silent: bool = False) -> bool:
-    """Copy data from source directory to ~/.clicodelog/data/{source}/."""
+def sync_data(source_id: str | None = None, silent: bool = False, stats: dict | None = None) -> bool:
+    """Copy data from source directory to ~/.clicodelog/data/{source}/.
+
+    `stats`, if given, is filled in while the sync runs (see `_additive_copy`,
+    plus "phase" and "reindexed") so callers can report progress.
+    """
     global last_sync_time
 
     if source_id is None:
@@ -94,7 +278,7 @@ def sync_data(source_id: str | None = None, silent: bool = False) -> bool:
     source_dir = source_config["source_dir"]
     dest_dir = DATA_DIR / source_config["data_subdir"]
 
-    with sync_lock:
+    with sync_locks[source_id]:
         if not source_dir.exists():
             if not silent:
                 print(f"Source directory not found: {source_dir}")
@@ -109,43 +293,118 @@ def sync_data(source_id: str | None = None, silent: bool = False) -> bool:
         # from dest. If Claude (or another tool) removes a project upstream,
         # we keep our local copy. This trades a little disk space for the
         # ability to recover sessions the source has pruned.
-        _additive_copy(source_dir, dest_dir)
-
-        if source_id == "claude-code":
-            project_count = sum(1 for p in dest_dir.iterdir() if p.is_dir())
-            session_count = sum(1 for p in dest_dir.iterdir() if p.is_dir() for _ in p.rglob("*.jsonl"))
-        elif source_id == "codex":
-            session_files = list(dest_dir.rglob("*.jsonl"))
-            session_count = len(session_files)
-            project_count = len(set(get_codex_cwd(f) for f in session_files if get_codex_cwd(f)))
-        else:  # gemini
-            session_files = list(dest_dir.rglob("chats/session-*.json"))
-            session_count = len(session_files)
-            project_count = len(set(get_gemini_project_hash(f) for f in session_files if get_gemini_project_hash(f)))
+        copy_stats: dict = stats if stats is not None else {}
+        copy_stats["phase"] = "copying"
+        _additive_copy(source_dir, dest_dir, copy_stats, workers=sync_workers)
+        copy_stats["phase"] = "indexing"
 
         last_sync_time[source_id] = datetime.now()
+        _refresh_indexes(source_id, silent, copy_stats)
 
-        # Keep the search index current right after the data changes.
         try:
-            from .search_index import refresh_index
-            refresh_index(source_id)
-        except Exception as e:
-            if not silent:
-                print(f"  (index refresh skipped: {e})")
+            from .catalog import source_counts
+            project_count, session_count = source_counts(source_id)
+        except Exception:
+            project_count = session_count = 0
 
+        copied = _format_copy_stats(copy_stats)
         if not silent:
-            print(f"Synced {project_count} projects with {session_count} sessions")
+            print(f"Synced {source_config['name']}: {project_count} projects with {session_count} sessions — {copied}")
         else:
             ts = last_sync_time[source_id].strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{ts}] Background sync ({source_config['name']}): {project_count} projects, {session_count} sessions")
+            print(f"[{ts}] Background sync ({source_config['name']}): {project_count} projects, {session_count} sessions — {copied}")
 
         return True
 
 
-def background_sync():
-    """Background thread: syncs all sources every SYNC_INTERVAL seconds."""
+def _refresh_indexes(source_id: str, silent: bool, stats: dict | None = None) -> None:
+    """Keep the catalog and search index current right after the data changes.
+
+    The copy already knows which files it wrote (stats["changed"]), so that
+    change set is applied directly instead of walking DATA_DIR again.
+    """
+    changed = (stats or {}).get("changed", [])
+    try:
+        from .catalog import update_paths
+        reparsed = update_paths(source_id, changed)
+        if stats is not None:
+            stats["reindexed"] = stats.get("reindexed", 0) + reparsed
+    except Exception as e:
+        if not silent:
+            print(f"  (catalog refresh skipped: {e})")
+    try:
+        from .search_index import update_paths
+        update_paths(source_id, changed)
+    except Exception as e:
+        if not silent:
+            print(f"  (index refresh skipped: {e})")
+
+
+# Watch mode: the catalog and full-text index are refreshed after the copy
+# on one background thread per source, so a slow re-read (a large live
+# session) never delays the next copy; paths copied meanwhile are merged
+# into the next refresh.
+_index_pending: dict = {}  # source_id -> copied paths awaiting a refresh
+_index_running: set = set()  # sources whose refresh thread is alive
+_index_lock = threading.Lock()
+
+
+def _defer_index_refresh(source_id: str, paths) -> None:
+    with _index_lock:
+        _index_pending.setdefault(source_id, set()).update(paths)
+        if source_id in _index_running:
+            return
+        _index_running.add(source_id)
+    threading.Thread(target=_index_refresh_loop, args=(source_id,), daemon=True).start()
+
+
+def _index_refresh_loop(source_id: str) -> None:
+    while True:
+        with _index_lock:
+            paths = _index_pending.pop(source_id, None)
+            if not paths:
+                _index_running.discard(source_id)
+                return
+        _refresh_indexes(source_id, True, {"changed": sorted(paths)})
+
+
+def sync_paths(source_id: str, paths) -> dict:
+    """Copy individual changed source files into the backup (watcher mode).
+
+    Same additive rules as `sync_data`, but only for the given paths under the
+    source dir, so a burst of writes to a live session costs one small copy.
+    The index refresh follows in the background. Returns the copy stats.
+    """
+    source_config = SOURCES[source_id]
+    source_dir = source_config["source_dir"]
+    dest_dir = DATA_DIR / source_config["data_subdir"]
+    copy_stats: dict = {}
+
+    with sync_locks[source_id]:
+        for p in paths:
+            src = Path(p)
+            try:
+                rel = src.relative_to(source_dir)
+            except ValueError:
+                continue
+            if not src.is_file():
+                continue
+            dest = dest_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            _additive_copy(src, dest, copy_stats)
+
+        if copy_stats.get("files"):
+            last_sync_time[source_id] = datetime.now()
+            _defer_index_refresh(source_id, copy_stats.get("changed", []))
+
+    return copy_stats
+
+
+def background_sync(interval: int = SYNC_INTERVAL):
+    """Background thread: syncs all sources every `interval` seconds (the
+    hourly poll, or the much rarer full reconcile in watcher mode)."""
     while True:
-        time.sleep(SYNC_INTERVAL)
+        time.sleep(interval)
         for source_id in SOURCES:
             try:
                 sync_data(source_id=source_id, silent=True)
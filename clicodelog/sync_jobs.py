@@ -0,0 +1,116 @@
+"""Background sync jobs, so a sync never blocks the web server.
+
+`start_sync_job` runs `sync_data` on a worker thread and returns a job record
+right away; the routes poll it (`GET /api/sync/jobs/{id}`) or stream it over
+SSE. A request for a source that already has a queued or running job gets
+that job back instead of starting a second copy of the same tree.
+"""
+
+import itertools
+import threading
+import time
+from datetime import datetime
+
+from . import sync as _sync
+
+_MAX_FINISHED = 50  # finished jobs kept for status lookups
+
+_jobs: dict = {}  # job id -> job record
+_active: dict = {}  # source_id -> id of its queued/running job
+_last_scanned: dict = {}  # source_id -> files scanned by the last finished job (ETA basis)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+
+
+def _run(job: dict) -> None:
+    source_id = job["source"]
+    stats = job["_stats"]
+    job["status"] = "running"
+    try:
+        ran = _sync.sync_data(source_id=source_id, silent=True, stats=stats)
+        if ran:
+            job["status"] = "success"
+        else:
+            job["status"] = "error"
+            job["message"] = f"Sync did not run for source '{source_id}'."
+    except Exception as e:
+        job["status"] = "error"
+        job["message"] = str(e)
+    finally:
+        job["finished"] = time.time()
+        if stats.get("scanned"):
+            _last_scanned[source_id] = stats["scanned"]
+        with _lock:
+            _active.pop(source_id, None)
+            finished = [j for j in _jobs.values() if j["finished"]]
+            for old in sorted(finished, key=lambda j: j["finished"])[:-_MAX_FINISHED]:
+                _jobs.pop(old["id"], None)
+
+
+def start_sync_job(source_id: str) -> dict:
+    """Start (or join) the sync job for a source; returns its public view."""
+    with _lock:
+        active = _active.get(source_id)
+        if active is not None:
+            return job_view(_jobs[active])
+        job = {
+            "id": str(next(_ids)),
+            "source": source_id,
+            "status": "queued",
+            "message": None,
+            "started": time.time(),
+            "finished": None,
+            "_stats": {},
+        }
+        _jobs[job["id"]] = job
+        _active[source_id] = job["id"]
+    threading.Thread(target=_run, args=(job,), daemon=True).start()
+    return job_view(job)
+
+
+def get_job(job_id: str) -> dict | None:
+    job = _jobs.get(job_id)
+    return job_view(job) if job else None
+
+
+def active_job(source_id: str) -> dict | None:
+    job_id = _active.get(source_id)
+    return get_job(job_id) if job_id else None
+
+
+def job_view(job: dict) -> dict:
+    stats = job["_stats"]
+    scanned = stats.get("scanned", 0)
+    end = job["finished"] or time.time()
+    elapsed = end - job["started"]
+
+    # ETA from the previous sync of this source: it scanned about as many
+    # files as this one will. Unknown on the first sync and while indexing.
+    eta = None
+    expected = _last_scanned.get(job["source"])
+    if job["status"] == "running" and stats.get("phase") == "copying" and expected and scanned:
+        eta = max(elapsed / scanned * (expected - scanned), 0.0)
+
+    last = _sync.last_sync_time.get(job["source"])
+    return {
+        "id": job["id"],
+        "source": job["source"],
+        "status": job["status"],
+        "message": job["message"],
+        "phase": stats.get("phase"),
+        "started": datetime.fromtimestamp(job["started"]).isoformat(),
+        "finished": datetime.fromtimestamp(job["finished"]).isoformat() if job["finished"] else None,
+        "elapsed_seconds": round(elapsed, 2),
+        "eta_seconds": round(eta, 1) if eta is not None else None,
+        "progress": {
+            "files_scanned": scanned,
+            "files_copied": stats.get("files", 0),
+            "bytes_copied": stats.get("bytes", 0),
+            "files_reindexed": stats.get("reindexed", 0),
+        },
+        "last_sync": last.isoformat() if last else None,
+    }
+
+
+def is_done(view: dict) -> bool:
+    return view["status"] in ("success", "error")
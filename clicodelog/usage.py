@@ -0,0 +1,90 @@
+"""Token usage and estimated cost rollups.
+
+Token counters are collected while sessions are indexed (sessions.py) and
+kept in the catalog per session file, day and model (catalog `usage` table),
+so a rollup by project / session / day / model is one aggregate query and
+no transcript is read. Cost is estimated from MODEL_PRICES when queried.
+"""
+
+from .catalog import usage_rows
+from .config import MODEL_PRICES
+
+GROUPS = ("project", "session", "day", "model")
+COUNTERS = ("input", "output", "cache_read", "cache_write", "requests")
+
+# Extra column each group brings along, and the name it is returned under.
+_LABELS = {"project": "project_name", "session": "project_id"}
+
+
+def model_price(model: str | None):
+    """(input, output, cache_read, cache_write) USD per million tokens, or None."""
+    name = (model or "").lower().rsplit("/", 1)[-1]  # e.g. "models/gemini-2.5-pro"
+    best = None
+    for prefix in MODEL_PRICES:
+        if name.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return MODEL_PRICES[best] if best else None
+
+
+def estimate_cost(model: str | None, counters: dict):
+    price = model_price(model)
+    if price is None:
+        return None
+    return sum(counters[k] * p for k, p in zip(COUNTERS, price)) / 1_000_000
+
+
+def _empty() -> dict:
+    return {**{k: 0 for k in COUNTERS}, "total_tokens": 0, "cost": 0.0, "unpriced_tokens": 0}
+
+
+def _add(rec: dict, row: dict, cost) -> None:
+    tokens = 0
+    for k in COUNTERS:
+        rec[k] += row[k] or 0
+        if k != "requests":
+            tokens += row[k] or 0
+    rec["total_tokens"] += tokens
+    if cost is None:
+        rec["unpriced_tokens"] += tokens
+    else:
+        rec["cost"] += cost
+
+
+def usage_stats(source_id: str, group_by=("project",), since: str | None = None, until: str | None = None,
+                project_id: str | None = None) -> dict:
+    """Usage and estimated cost per `group_by` key (any of GROUPS) for days in
+    [since, until], plus the total over all rows."""
+    merged: dict = {}
+    total = _empty()
+    unpriced = set()
+    for row in usage_rows(source_id, group_by, since, until, project_id):
+        cost = estimate_cost(row["model"], row)
+        if cost is None:
+            unpriced.add(row["model"])
+        key = tuple(row[g] for g in group_by)
+        rec = merged.get(key)
+        if rec is None:
+            rec = merged[key] = {g: row[g] for g in group_by}
+            for g, label in _LABELS.items():
+                if g in group_by:
+                    rec[label] = row[f"{g}_label"]
+            rec.update(_empty())
+        _add(rec, row, cost)
+        _add(total, row, cost)
+
+    rows = list(merged.values())
+    rows.sort(key=lambda r: (-r["cost"], -r["total_tokens"]))
+    if "day" in group_by:
+        rows.sort(key=lambda r: r["day"])
+    for rec in rows + [total]:
+        rec["cost"] = round(rec["cost"], 4)
+    return {
+        "source": source_id,
+        "group_by": list(group_by),
+        "since": since,
+        "until": until,
+        "currency": "USD",
+        "rows": rows,
+        "total": total,
+        "unpriced_models": sorted(unpriced),
+    }
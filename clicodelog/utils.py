@@ -1,5 +1,11 @@
 import base64
 import json
+import os
+from functools import lru_cache
+from itertools import islice
+
+from .jsonlib import loads
+from .jsonstream import iter_members
 
 
 def encode_path_id(path: str) -> str:
@@ -13,17 +19,44 @@ def decode_path_id(encoded_id: str) -> str:
     return base64.urlsafe_b64decode(encoded_id.encode()).decode()
 
 
+# --- Header readers -----------------------------------------------------------
+# Project grouping only needs one field near the top of a session file, so
+# these read a bounded prefix instead of the whole file. Results are cached
+# per (path, size, mtime), so an unchanged file is never re-read.
+_HEADER_LINES = 20  # JSONL lines searched for the Codex session_meta
+_HEADER_CHUNK = 4096  # bytes read at a time from a Gemini session
+_HEADER_MAX_BYTES = 64 * 1024  # past this, parse the whole Gemini file instead
+_HEADER_CACHE_SIZE = 16384
+
+
+def _stat_key(session_file):
+    st = os.stat(session_file)
+    return str(session_file), st.st_size, st.st_mtime_ns
+
+
 def get_codex_cwd(session_file) -> str | None:
     """Extract cwd from a Codex session file for project grouping."""
     try:
-        with open(session_file, "r") as f:
-            for line in f:
+        return _codex_cwd(*_stat_key(session_file))
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=_HEADER_CACHE_SIZE)
+def _codex_cwd(path: str, size: int, mtime_ns: int) -> str | None:
+    # session_meta is the first line of a Codex log; only lines that mention
+    # it are decoded.
+    try:
+        with open(path, "rb") as fh:
+            for line in islice(fh, _HEADER_LINES):
+                if b'"session_meta"' not in line:
+                    continue
                 try:
-                    entry = json.loads(line)
-                    if entry.get("type") == "session_meta":
-                        return entry.get("payload", {}).get("cwd", "")
-                except json.JSONDecodeError:
+                    entry = loads(line)
+                except ValueError:
                     continue
+                if entry.get("type") == "session_meta":
+                    return entry.get("payload", {}).get("cwd", "")
     except Exception:
         pass
     return None
@@ -32,9 +65,27 @@ def get_codex_cwd(session_file) -> str | None:
 def get_gemini_project_hash(session_file) -> str | None:
     """Extract projectHash from a Gemini session file for project grouping."""
     try:
-        with open(session_file, "r") as f:
-            data = json.load(f)
-            return data.get("projectHash", "")
+        return _gemini_project_hash(*_stat_key(session_file))
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=_HEADER_CACHE_SIZE)
+def _gemini_project_hash(path: str, size: int, mtime_ns: int) -> str | None:
+    # Decode top-level members in order until projectHash turns up; only if
+    # it is not within the first _HEADER_MAX_BYTES is the file parsed whole.
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for key, value in iter_members(f, stream=("messages",), chunk_size=_HEADER_CHUNK,
+                                           max_chars=_HEADER_MAX_BYTES):
+                if key == "projectHash":
+                    return value
+        return ""
+    except ValueError:
+        pass
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("projectHash", "")
     except Exception:
         pass
     return None
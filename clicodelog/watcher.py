@@ -0,0 +1,178 @@
+"""Event-driven sync: copy changed source files as soon as they are written.
+
+Watches every SOURCES[...]["source_dir"] recursively and hands changed file
+paths to `sync.sync_paths` after a short debounce, so the backup (and the UI)
+trails a live session by about a second instead of up to an hour.
+
+Backends, best first:
+  * watchdog, when installed (inotify / FSEvents / kqueue / Windows);
+  * a small ctypes binding to Linux inotify;
+  * none — `start_watcher` returns None and the caller keeps polling.
+Events can be missed (queue overflow, directories created before their watch
+is added), so the periodic full sync keeps running, just much less often.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import time
+
+from .config import SOURCES, WATCH_DEBOUNCE, WATCH_MAX_DELAY
+
+# --- Debounced hand-off to sync ----------------------------------------------
+_pending: dict = {}  # source_id -> set of changed paths
+_first_event = 0.0
+_last_event = 0.0
+_cond = threading.Condition()
+
+
+def _queue(source_id: str, path: str) -> None:
+    global _first_event, _last_event
+    with _cond:
+        now = time.monotonic()
+        if not _pending:
+            _first_event = now
+        _last_event = now
+        _pending.setdefault(source_id, set()).add(path)
+        _cond.notify()
+
+
+def _flush_loop() -> None:
+    from .sync import sync_paths
+
+    while True:
+        with _cond:
+            while not _pending:
+                _cond.wait()
+            # Wait for a quiet period, but never hold changes longer than
+            # WATCH_MAX_DELAY — a live session writes continuously.
+            while True:
+                now = time.monotonic()
+                quiet = now - _last_event
+                if quiet >= WATCH_DEBOUNCE or now - _first_event >= WATCH_MAX_DELAY:
+                    break
+                _cond.wait(min(WATCH_DEBOUNCE - quiet, WATCH_MAX_DELAY - (now - _first_event)))
+            batch = dict(_pending)
+            _pending.clear()
+        for source_id, paths in batch.items():
+            try:
+                sync_paths(source_id, paths)
+            except Exception as e:
+                print(f"[Watch sync error for {source_id}] {e}")
+
+
+# --- watchdog backend --------------------------------------------------------
+def _start_watchdog(roots: dict) -> bool:
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return False
+
+    class _Handler(FileSystemEventHandler):
+        def __init__(self, source_id):
+            self.source_id = source_id
+
+        def on_any_event(self, event):
+            if event.is_directory or event.event_type not in ("created", "modified", "moved", "closed"):
+                return
+            _queue(self.source_id, getattr(event, "dest_path", "") or event.src_path)
+
+    observer = Observer()
+    observer.daemon = True
+    for path, source_id in roots.items():
+        observer.schedule(_Handler(source_id), path, recursive=True)
+    observer.start()
+    return True
+
+
+# --- inotify backend (Linux, ctypes) -----------------------------------------
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len — then `len` name bytes
+
+
+def _start_inotify(roots: dict) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = libc.inotify_init1(_IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return False
+    if fd < 0:
+        return False
+
+    watches: dict = {}  # wd -> (dir path, source_id)
+
+    def add_tree(top: str, source_id: str, report: bool) -> None:
+        # Files created in a new directory before its watch existed are
+        # reported here, so nothing written in that window is lost.
+        for dirpath, _dirnames, filenames in os.walk(top):
+            wd = libc.inotify_add_watch(fd, os.fsencode(dirpath), _WATCH_MASK)
+            if wd >= 0:
+                watches[wd] = (dirpath, source_id)
+            if report:
+                for name in filenames:
+                    _queue(source_id, os.path.join(dirpath, name))
+
+    def read_loop() -> None:
+        while True:
+            try:
+                buf = os.read(fd, 64 * 1024)
+            except OSError:
+                return
+            pos = 0
+            while pos + _EVENT.size <= len(buf):
+                wd, mask, _cookie, length = _EVENT.unpack_from(buf, pos)
+                name = buf[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+                pos += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    print("[Watch] inotify queue overflowed; changes will be picked up by the next full sync")
+                    continue
+                if mask & _IN_IGNORED:
+                    watches.pop(wd, None)
+                    continue
+                if wd not in watches or not name:
+                    continue
+                dirpath, source_id = watches[wd]
+                full = os.path.join(dirpath, os.fsdecode(name))
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        add_tree(full, source_id, report=True)
+                else:
+                    _queue(source_id, full)
+
+    for path, source_id in roots.items():
+        add_tree(path, source_id, report=False)
+    threading.Thread(target=read_loop, daemon=True).start()
+    return True
+
+
+def start_watcher() -> str | None:
+    """Start watching all existing source dirs. Returns the backend name, or
+    None if no backend is available (the caller should keep polling)."""
+    roots = {
+        str(cfg["source_dir"]): sid
+        for sid, cfg in SOURCES.items()
+        if cfg["source_dir"].is_dir()
+    }
+    if not roots:
+        return None
+    for name, start in (("watchdog", _start_watchdog), ("inotify", _start_inotify)):
+        if start(roots):
+            threading.Thread(target=_flush_loop, daemon=True).start()
+            return name
+    return None
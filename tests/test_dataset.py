@@ -0,0 +1,83 @@
+import json
+
+from clicodelog.dataset_rows import _session_columns
+from clicodelog.sessions import _read_session_state
+
+
+def _write(path, entries):
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries))
+    return path
+
+
+def _token_count(last=None, total=None):
+    info = {}
+    if last is not None:
+        info["last_token_usage"] = last
+    if total is not None:
+        info["total_token_usage"] = total
+    return {"type": "event_msg", "timestamp": "2026-01-01T00:00:05Z",
+            "payload": {"type": "token_count", "info": info}}
+
+
+def _codex_entries():
+    ts = "2026-01-01T00:00:00Z"
+
+    def item(payload):
+        return {"type": "response_item", "timestamp": ts, "payload": payload}
+
+    return [
+        {"type": "session_meta", "timestamp": ts, "payload": {"cwd": "/w", "model_provider": "openai"}},
+        {"type": "turn_context", "timestamp": ts, "payload": {"model": "gpt-5"}},
+        item({"type": "message", "role": "user", "content": [{"type": "input_text", "text": "hi"}]}),
+        item({"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": "on it"}]}),
+        item({"type": "function_call", "name": "shell", "arguments": "{}", "call_id": "c1"}),
+        _token_count(total={"input_tokens": 100, "cached_input_tokens": 40, "output_tokens": 10}),
+        # The same totals re-sent with a rate-limit update count once.
+        _token_count(total={"input_tokens": 100, "cached_input_tokens": 40, "output_tokens": 10}),
+        item({"type": "message", "role": "user", "content": [{"type": "input_text", "text": "more"}]}),
+        _token_count(last={"input_tokens": 30, "cached_input_tokens": 0, "output_tokens": 5},
+                     total={"input_tokens": 130, "cached_input_tokens": 40, "output_tokens": 15}),
+        item({"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": "done"}]}),
+        _token_count(total={"input_tokens": 200, "cached_input_tokens": 90, "output_tokens": 25}),
+    ]
+
+
+def test_codex_token_counts_go_to_the_preceding_assistant_message(tmp_path):
+    path = _write(tmp_path / "rollout.jsonl", _codex_entries())
+    cols = _session_columns("codex", str(path), "s", None)
+
+    assert cols["role"] == ["user", "assistant", "user", "assistant"]
+    assert cols["tool_names"][1] == ["shell"]
+    # The count after the second user message still belongs to the first reply.
+    assert cols["input_tokens"] == [None, 90, None, 20]
+    assert cols["output_tokens"] == [None, 15, None, 10]
+    assert cols["cache_read_tokens"] == [None, 40, None, 50]
+    assert cols["cache_write_tokens"] == [None, 0, None, 0]
+
+
+def test_codex_tokens_match_the_usage_rollup(tmp_path):
+    path = _write(tmp_path / "rollout.jsonl", _codex_entries())
+    cols = _session_columns("codex", str(path), "s", None)
+    usage = [0, 0, 0, 0]
+    for counters in _read_session_state(path, "codex")["usage"].values():
+        usage = [a + b for a, b in zip(usage, counters)]
+    totals = [sum(v or 0 for v in cols[name])
+              for name in ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")]
+    assert totals == usage
+
+
+def test_claude_usage(tmp_path):
+    path = _write(tmp_path / "s.jsonl", [
+        {"type": "user", "timestamp": "2026-01-01T00:00:00Z", "message": {"role": "user", "content": "hi"}},
+        {"type": "assistant", "timestamp": "2026-01-01T00:00:01Z",
+         "message": {"role": "assistant", "model": "m", "content": [{"type": "text", "text": "hello"}],
+                     "usage": {"input_tokens": 3, "output_tokens": 7, "cache_read_input_tokens": 11,
+                               "cache_creation_input_tokens": 13}}},
+    ])
+    cols = _session_columns("claude-code", str(path), "s", None)
+    assert cols["role"] == ["user", "assistant"]
+    assert cols["input_tokens"] == [None, 3]
+    assert cols["output_tokens"] == [None, 7]
+    assert cols["cache_read_tokens"] == [None, 11]
+    assert cols["cache_write_tokens"] == [None, 13]
+    assert cols["text_length"] == [2, 5]
@@ -0,0 +1,43 @@
+import io
+import json
+
+import pytest
+
+from clicodelog.jsonstream import iter_members
+
+DOCS = [
+    '{"sessionId": "x", "messages": [62327.789458281324, 1e5, -0.25E-3, 7, {"a": 1.5}]}',
+    '{"n": 12345678901234567890, "f": 3.14159, "e": 2E+10, "t": true, "z": null}',
+    '{"messages": [], "s": "1.5e3", "x": [1, 2.0, -3]}',
+]
+
+
+def _members(doc, chunk_size, stream=()):
+    out = {}
+    for key, value in iter_members(io.StringIO(doc), stream=stream, chunk_size=chunk_size):
+        if key in stream:
+            out.setdefault(key, []).append(value)
+        else:
+            out[key] = value
+    return out
+
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_every_chunk_size_matches_json_loads(doc):
+    expected = json.loads(doc)
+    for chunk_size in range(1, len(doc) + 2):
+        got = _members(doc, chunk_size, stream=("messages",))
+        if expected.get("messages") == []:
+            got.setdefault("messages", [])
+        assert got == expected, chunk_size
+
+
+def test_number_cut_at_chunk_boundary():
+    doc = '{"sessionId": "x", "messages": [62327.789458281324, 1e5]}'
+    assert _members(doc, 2, stream=("messages",))["messages"] == [62327.789458281324, 1e5]
+    assert _members(doc, 2) == json.loads(doc)
+
+
+def test_truncated_document_raises():
+    with pytest.raises(ValueError):
+        _members('{"a": 1.', 2)